@@ -0,0 +1,278 @@
+# ANIMATION EXPORT
+
+# The FuncAnimation in coursera_week3.py draws its frames one after another, every one of them by the same update
+# function changing pyplot's current axes, and only stops when update calls a.event_source.stop(). Saving it to a video
+# file with Animation.save works the same way, one frame at a time on one core.
+
+# For exporting, a frame here is a pure function of its index: make_frame(fig, i) draws frame i into an empty Figure,
+# and doesn't depend on which frames were drawn before it. Then frames can be drawn in any order and in any process.
+
+# The frames are split into segments of consecutive frames. Each segment is drawn by a worker process on the Agg
+# backend, and the raw RGBA buffer of every frame is written straight into an encoder: ffmpeg through a pipe when it's
+# installed, otherwise Pillow, which can write GIF and WebP but not MP4. Every finished segment is its own small file
+# in work_dir, written under a temporary name and renamed at the end, so:
+
+#   an export that was stopped can be started again and only draws the segments that are missing;
+#   the segments can be shared out between machines with shard=(k, n), each of which draws every n-th segment
+#   starting at k, and whichever run finds all the segments there joins them into the output file.
+
+#   python animation_export.py sampling.gif --frames 10000 --workers 8
+#   python animation_export.py sampling.mp4 --frames 10000 --shard 0/4 --work-dir segments
+
+import argparse
+import contextlib
+import functools
+import importlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+
+# the histogram from coursera_week3.py after i samples, drawn from scratch so it only depends on i
+def sampling_frame(fig, i, samples=100, seed=0):
+    x = sampling_data(samples, seed)
+    ax = fig.add_subplot()
+    ax.hist(x[:i], bins=np.arange(-4, 4, 0.5))
+    ax.axis([-4, 4, 0, max(30, samples * 0.3)])
+    ax.set_title('Sampling the Normal Distribution')
+    ax.set_ylabel('Frequency')
+    ax.set_xlabel('Value')
+    ax.annotate('n = {}'.format(i), [3, ax.get_ylim()[1] * 0.9])
+
+
+@functools.lru_cache(maxsize=4)
+def sampling_data(samples, seed):
+    return np.random.default_rng(seed).standard_normal(samples)
+
+
+def ffmpeg_path():
+    import matplotlib as mpl
+    return shutil.which(mpl.rcParams['animation.ffmpeg_path']) or shutil.which('ffmpeg')
+
+
+# ffmpeg arguments for the output, by file extension
+FFMPEG_OUTPUT = {
+    '.mp4': ['-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2'],
+    '.gif': ['-vf', 'split[a][b];[a]palettegen[p];[b][p]paletteuse', '-loop', '0'],
+    '.webp': ['-c:v', 'libwebp', '-loop', '0', '-lossless', '1'],
+}
+
+
+class FFmpegEncoder:
+
+    def __init__(self, path, size, fps):
+        ext = os.path.splitext(path)[1].lower()
+        width, height = size
+        command = [ffmpeg_path(), '-y', '-loglevel', 'error',
+                   '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', '{}x{}'.format(width, height), '-r', str(fps),
+                   '-i', '-'] + FFMPEG_OUTPUT[ext] + [path]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, rgba, size):
+        self.process.stdin.write(rgba)
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait():
+            raise RuntimeError('ffmpeg exited with status {}'.format(self.process.returncode))
+
+    # stop without finishing the file, for when drawing a frame failed
+    def abort(self):
+        self.process.kill()
+        self.process.stdin.close()
+        self.process.wait()
+
+
+class PillowEncoder:
+
+    def __init__(self, path, size, fps):
+        self.path = path
+        self.format = os.path.splitext(path)[1].lower().lstrip('.')
+        self.duration = 1000 / fps
+        self.frames = []
+
+    def write(self, rgba, size):
+        from PIL import Image
+        image = Image.frombuffer('RGBA', size, rgba, 'raw', 'RGBA', 0, 1).convert('RGB')
+        self.frames.append(image.quantize() if self.format == 'gif' else image)
+
+    def close(self):
+        write_frames(self.frames, self.path, self.format, self.duration)
+
+    def abort(self):
+        self.frames = []
+
+
+# frames is an iterator of PIL images. The GIF writer takes them one at a time, the WebP writer needs a list.
+def write_frames(frames, path, format, duration):
+    frames = iter(frames)
+    first = next(frames)
+    rest, extra = (list(frames), {'lossless': True}) if format == 'webp' else (frames, {})
+    first.save(path, format=format.upper(), save_all=True, append_images=rest, duration=duration, loop=0, **extra)
+
+
+def encoder(path, size, fps):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FFMPEG_OUTPUT:
+        raise ValueError('can only export to {}'.format(', '.join(sorted(FFMPEG_OUTPUT))))
+    if ffmpeg_path():
+        return FFmpegEncoder(path, size, fps)
+    if ext == '.mp4':
+        raise RuntimeError('ffmpeg is needed to write mp4 files')
+    return PillowEncoder(path, size, fps)
+
+
+# draw frames start to stop-1 and encode them into path, this is what runs in a worker process.
+# One figure is made per segment and cleared between frames, the frames themselves start from an empty figure.
+def render_segment(make_frame, start, stop, path, fps, figsize, dpi):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    out = None
+    closed = False
+    ext = os.path.splitext(path)[1]
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp' + ext)
+    os.close(fd)
+    try:
+        for i in range(start, stop):
+            fig.clear()
+            make_frame(fig, i)
+            canvas.draw()
+            size = canvas.get_width_height()
+            if out is None:
+                out = encoder(tmp, size, fps)
+            out.write(canvas.buffer_rgba(), size)
+        closed = True
+        out.close()
+        os.replace(tmp, path)
+    finally:
+        # an encoder that was left running (ffmpeg waiting on its stdin) is stopped before its file is removed
+        if out is not None and not closed:
+            out.abort()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+def segment_path(work_dir, index, ext):
+    return os.path.join(work_dir, 'segment_{:06d}{}'.format(index, ext))
+
+
+# join the segment files into the output file, in order
+def join_segments(paths, out, fps):
+    ext = os.path.splitext(out)[1].lower()
+    if ffmpeg_path():
+        fd, listing = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'w') as f:
+            f.writelines("file '{}'\n".format(os.path.abspath(p)) for p in paths)
+        # mp4 segments can be copied as they are, gif and webp are decoded and encoded again
+        codec = ['-c', 'copy'] if ext == '.mp4' else FFMPEG_OUTPUT[ext]
+        try:
+            subprocess.run([ffmpeg_path(), '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0', '-i', listing]
+                           + codec + [out], check=True)
+        finally:
+            os.remove(listing)
+        return out
+    if ext == '.webp':
+        join_webp(paths, out, 1000 / fps)
+    else:
+        write_frames(segment_frames(paths), out, ext.lstrip('.'), 1000 / fps)
+    return out
+
+
+# the WebP writer takes a list of images, not an iterator, but an image can have many frames. So it's given the segment
+# files themselves, and it decodes one frame at a time out of them. What stays in memory is the compressed data of the
+# segments, about the size of the output, which the encoder keeps anyway until it writes the file.
+def join_webp(paths, out, duration):
+    from PIL import Image
+    with contextlib.ExitStack() as stack:
+        images = [stack.enter_context(Image.open(path)) for path in paths]
+        images[0].save(out, format='WEBP', save_all=True, append_images=images[1:], duration=duration, loop=0,
+                       lossless=True)
+
+
+# the frames of the segment files one after another, only one segment is open at a time (for GIF)
+def segment_frames(paths):
+    from PIL import Image, ImageSequence
+    for path in paths:
+        with Image.open(path) as image:
+            for frame in ImageSequence.Iterator(image):
+                yield frame.copy()
+
+
+# export frames 0 to frames-1 of make_frame to out.
+# Segments that are already in work_dir are not drawn again. Returns out once every segment is there and they have been
+# joined, or None if some are still missing (because other shards haven't finished yet).
+def export(make_frame, frames, out, fps=10, figsize=None, dpi=100, workers=None, segment_frames=100,
+           shard=(0, 1), work_dir=None, keep_segments=False):
+    ext = os.path.splitext(out)[1].lower()
+    if ext == '.mp4' and not ffmpeg_path():
+        raise RuntimeError('ffmpeg is needed to write mp4 files')
+    work_dir = work_dir or out + '.segments'
+    os.makedirs(work_dir, exist_ok=True)
+    starts = range(0, frames, segment_frames)
+    paths = [segment_path(work_dir, index, ext) for index in range(len(starts))]
+    k, n = shard
+    todo = [index for index in range(k, len(starts), n) if not os.path.exists(paths[index])]
+
+    if todo:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(render_segment, make_frame, starts[index], min(starts[index] + segment_frames, frames),
+                                   paths[index], fps, figsize, dpi) for index in todo]
+            for future in futures:
+                future.result()
+
+    if not all(os.path.exists(path) for path in paths):
+        return None
+    join_segments(paths, out, fps)
+    if not keep_segments:
+        shutil.rmtree(work_dir)
+    return out
+
+
+# 'module:function' to the function, extra keyword arguments are bound with functools.partial
+def load_frame_function(spec, **kwargs):
+    module, name = spec.split(':')
+    return functools.partial(getattr(importlib.import_module(module), name), **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export an animation to mp4, gif or webp, drawing frames in parallel.')
+    parser.add_argument('out', help='output file, .mp4, .gif or .webp')
+    parser.add_argument('--frame-function', default='animation_export:sampling_frame',
+                        help='module:function taking (fig, i), default is the sampling histogram of coursera_week3.py')
+    parser.add_argument('--frames', type=int, default=100,
+                        help='number of frames, for the default function the number of samples (drawn in frames + 1)')
+    parser.add_argument('--fps', type=float, default=10)
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--segment', type=int, default=100, help='frames per segment')
+    parser.add_argument('--shard', default='0/1', help='k/n, draw every n-th segment starting at k')
+    parser.add_argument('--work-dir', help='where the segments are kept, default is <out>.segments')
+    parser.add_argument('--keep-segments', action='store_true')
+    args = parser.parse_args(argv)
+
+    frames, kwargs = args.frames, {}
+    if args.frame_function == 'animation_export:sampling_frame':
+        # --frames samples, shown from n = 0 up to n = frames like update() in coursera_week3.py, that's one frame more
+        frames, kwargs = args.frames + 1, {'samples': args.frames}
+    make_frame = load_frame_function(args.frame_function, **kwargs)
+    k, n = (int(part) for part in args.shard.split('/'))
+    result = export(make_frame, frames, args.out, fps=args.fps, dpi=args.dpi, workers=args.workers,
+                    segment_frames=args.segment, shard=(k, n), work_dir=args.work_dir,
+                    keep_segments=args.keep_segments)
+    if result is None:
+        print('segments of shard {} are done, waiting for the other shards'.format(args.shard))
+    else:
+        print('wrote {}'.format(result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# ARRAY HELPERS
+
+# Small helpers for numpy arrays that several of the modules here share:
+
+#   ColumnCache keeps results per column (quartiles in box_stats.py, densities in fast_kde.py). A column is recognised by
+#   the memory it points to, so df['normal'] is the same column every time it's looked up. An address on its own isn't
+#   enough, once an array is freed the next one can be given the same memory, so every entry also keeps a weak reference
+#   to the array that owns the memory and is dropped as soon as that array goes;
+#   bin_index puts values into evenly spaced bins the way np.histogram does, without sorting or searching, for the
+#   histograms and heatmaps that are filled a chunk at a time.
+
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+
+def column_key(values, version):
+    interface = values.__array_interface__
+    return (interface['data'][0], values.shape, values.strides, values.dtype.str, version)
+
+
+# the object that owns the memory values points into: the base array of a view, or the buffer under a memory map
+def memory_owner(values):
+    while isinstance(values.base, np.ndarray):
+        values = values.base
+    return values if values.base is None else values.base
+
+
+class ColumnCache:
+
+    # a least recently used cache of results per column (and whatever else the result depends on, in extra)
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # keys of entries whose array has gone, the weakref callbacks only note them down (they can run in the middle
+        # of a get or put) and they are dropped on the next one
+        self._dead = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, values, extra=(), version=0):
+        key = (column_key(values, version), extra)
+        with self._lock:
+            self._drop_dead()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            ref, result = entry
+            if ref() is not memory_owner(values):
+                # the memory belongs to a different array now
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, values, result, extra=(), version=0):
+        key = (column_key(values, version), extra)
+        owner = memory_owner(values)
+        try:
+            # the entry goes away with the array, so the address can't be matched by a new array later
+            ref = weakref.ref(owner, lambda _, key=key: self._dead.append(key))
+        except TypeError:
+            # memory that can't be referenced weakly is kept alive by the entry instead
+            ref = lambda: owner
+        with self._lock:
+            self._drop_dead()
+            self._entries[key] = (ref, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def _drop_dead(self):
+        while self._dead:
+            key = self._dead.pop()
+            entry = self._entries.get(key)
+            if entry is not None and entry[0]() is None:
+                del self._entries[key]
+
+
+# the bin of each value for evenly spaced edges, the last bin includes its right edge like np.histogram
+def bin_index(values, edges):
+    nbins = len(edges) - 1
+    position = np.floor((values - edges[0]) * (nbins / (edges[-1] - edges[0])))
+    # nan and inf have no integer value, they (and anything too far out to fit in one) get -1, outside the range
+    position[~(np.abs(position) <= nbins + 1)] = -1
+    index = position.astype(np.int64)
+    # rounding can put a value right on an edge into the neighbouring bin, np.histogram fixes it up the same way
+    valid = (index >= 0) & (index < nbins)
+    index[valid & (values < edges[np.clip(index, 0, nbins)])] -= 1
+    index[valid & (values >= edges[np.clip(index + 1, 0, nbins)]) & (index < nbins - 1)] += 1
+    index[values == edges[-1]] = nbins - 1
+    return index
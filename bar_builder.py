@@ -0,0 +1,118 @@
+# GROUPED AND STACKED BAR CHARTS
+
+# coursera_week2.py builds a grouped bar chart by looping over xvals to add 0.3 to each one before the second plt.bar,
+# and stacked bars with one plt.bar (or plt.barh) per series, passing the previous series as bottom (or left). Every bar
+# becomes its own Rectangle artist, and every error bar its own line.
+
+# bar_chart takes all the series at once, as a 2-D array with one row per category and one column per series, or a
+# DataFrame (the index gives the categories and the columns the series). All the positions, and the running totals for
+# stacking, are worked out with numpy, and each series is drawn as one PolyCollection, the corners of all its bars in a
+# single array, so a series is one artist however many categories there are. The error bars of all the series are one
+# LineCollection.
+
+import numpy as np
+import matplotlib as mpl
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.ticker import FixedLocator, FuncFormatter, MaxNLocator
+
+
+# the corners of n bars as an (n, 4, 2) array, from their position along the category axis and their value range
+def bar_vertices(pos, width, lo, hi, horizontal=False):
+    left, right = pos - width / 2, pos + width / 2
+    xs = np.stack([left, left, right, right], axis=1)
+    ys = np.stack([lo, hi, hi, lo], axis=1)
+    return np.stack([ys, xs] if horizontal else [xs, ys], axis=2)
+
+
+# the start (bottom or left) of every bar when the series are stacked. Like pandas, positive values stack upwards from
+# zero and negative values downwards, so a negative bar never hides a positive one.
+def stack_starts(values):
+    positive = np.where(values > 0, values, 0)
+    negative = np.where(values < 0, values, 0)
+    pos_start = np.cumsum(positive, axis=1) - positive
+    neg_start = np.cumsum(negative, axis=1) - negative
+    return np.where(values < 0, neg_start, pos_start)
+
+
+def bar_chart(ax, data, labels=None, categories=None, stacked=False, horizontal=False, width=0.8, err=None,
+              colors=None, capsize=3, err_kwds=None, legend=True, **collection_kwds):
+    if hasattr(data, 'columns'):
+        labels = [str(c) for c in data.columns] if labels is None else labels
+        categories = list(data.index) if categories is None else categories
+        data = data.to_numpy(dtype=float)
+    values = np.asarray(data, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    n_categories, n_series = values.shape
+    if labels is None:
+        labels = ['Series {}'.format(j + 1) for j in range(n_series)]
+    if colors is None:
+        cycle = mpl.rcParams['axes.prop_cycle'].by_key()['color']
+        colors = [cycle[j % len(cycle)] for j in range(n_series)]
+
+    centres = np.arange(n_categories, dtype=float)
+    if stacked:
+        starts = stack_starts(values)
+        positions = np.broadcast_to(centres[:, None], values.shape)
+        bar_width = width
+    else:
+        starts = np.zeros_like(values)
+        bar_width = width / n_series
+        # the bars of a category sit side by side, centred on the category
+        positions = centres[:, None] + (np.arange(n_series) - (n_series - 1) / 2) * bar_width
+    ends = starts + values
+
+    collections = []
+    for j in range(n_series):
+        verts = bar_vertices(positions[:, j], bar_width, starts[:, j], ends[:, j], horizontal)
+        collection = PolyCollection(verts, facecolors=colors[j], label=labels[j], **collection_kwds)
+        # like plt.bar, autoscaling doesn't add a margin below the zero line
+        (collection.sticky_edges.x if horizontal else collection.sticky_edges.y).append(0)
+        ax.add_collection(collection)
+        collections.append(collection)
+
+    corners = bar_vertices(positions.ravel(), bar_width, starts.ravel(), ends.ravel(), horizontal)
+    ax.update_datalim(corners.reshape(-1, 2))
+
+    if err is not None:
+        # a single error for everything, one per category, or one per bar
+        err = np.asarray(err, dtype=float)
+        err = np.broadcast_to(err[:, None] if err.ndim == 1 else err, values.shape)
+        collections.append(error_bars(ax, positions.ravel(), ends.ravel(), err.ravel(), horizontal, capsize,
+                                      **(err_kwds or {})))
+
+    category_ticks(ax.yaxis if horizontal else ax.xaxis, n_categories, categories)
+    ax.autoscale_view()
+    if legend and n_series > 1:
+        ax.legend(handles=collections[:n_series])
+    return collections
+
+
+# a tick for every category, unless there are so many that their labels would only pile up on top of each other. Then
+# the locator picks a readable number of them, and the formatter looks up the names of the ones it picked.
+def category_ticks(axis, n_categories, categories=None, max_ticks=50):
+    if n_categories <= max_ticks:
+        axis.set_major_locator(FixedLocator(np.arange(n_categories)))
+    else:
+        axis.set_major_locator(MaxNLocator(integer=True))
+    if categories is not None:
+        names = [str(c) for c in categories]
+        axis.set_major_formatter(FuncFormatter(lambda x, pos: names[int(x)] if 0 <= x < len(names) else ''))
+
+
+# all the error bars as one LineCollection: a line through the end of each bar, with a cap at both ends.
+# capsize is half the cap length, in points.
+def error_bars(ax, pos, value, err, horizontal=False, capsize=3, color='black', **kwds):
+    lo, hi = value - err, value + err
+    lines = np.stack([np.column_stack([pos, lo]), np.column_stack([pos, hi])], axis=1)
+    if horizontal:
+        lines = lines[:, :, ::-1]
+    collection = LineCollection(lines, colors=color, **kwds)
+    ax.add_collection(collection)
+    ax.update_datalim(lines.reshape(-1, 2))
+    if capsize:
+        # the caps are markers, so they keep the same size in points whatever the scale of the axes
+        caps = np.concatenate([lines[:, 0], lines[:, 1]])
+        ax.plot(caps[:, 0], caps[:, 1], linestyle='none', marker='|' if horizontal else '_', markersize=2 * capsize,
+                color=color)
+    return collection
@@ -0,0 +1,174 @@
+# BATCH RENDERING
+
+# This is the entry point for regenerating all the figures from figure_jobs.py without a display. Every job is rendered
+# on the Agg backend in a process pool, each into its own Figure object that is thrown away afterwards, so nothing
+# builds up in pyplot's figure manager and all the cores get used.
+
+# Files are written as <out>/<job>.<format>, so the same job always ends up in the same file. Each job reports how long
+# it took and the peak resident memory of the process that rendered it.
+
+#   python batch_render.py --out figures --formats png svg --workers 4
+#   python batch_render.py week3_heatmap week4_kde
+
+# With --cache, a figure whose job code, input files, seed, style, format and dpi haven't changed is copied out of the
+# figure cache (see figure_cache.py) instead of being drawn again.
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def render_job(name, out_dir, formats, dpi=100, seed=123, profile=False, cache_dir=None, cache_bytes=512 * 2**20):
+    # the backend has to be chosen before anything imports pyplot, pandas plotting does that on its own
+    import matplotlib
+    matplotlib.use('Agg')
+    import figure_jobs
+    # the job's style is in place for the cache key as well as for drawing and saving
+    with figure_jobs.job_style(name):
+        return _render_job(name, out_dir, formats, dpi, seed, profile, cache_dir, cache_bytes)
+
+
+def _render_job(name, out_dir, formats, dpi, seed, profile, cache_dir, cache_bytes):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    import figure_jobs
+    from profiling import FigureProfiler
+    from figure_cache import FigureCache, figure_key, file_digests
+
+    start = time.perf_counter()
+    result = {'job': name, 'files': []}
+    cache = FigureCache(cache_dir, cache_bytes) if cache_dir else None
+    keys = {}
+    if cache:
+        # the jobs share helpers like walk_frame, so the whole of figure_jobs.py is part of the key, not just the job,
+        # and so are the contents of the files the job reads
+        try:
+            with open(figure_jobs.__file__, 'rb') as f:
+                params = {'seed': seed, 'jobs_source': f.read(),
+                          'inputs': file_digests(figure_jobs.JOB_INPUTS.get(name, []))}
+            keys = {fmt: figure_key(figure_jobs.JOBS[name], [], params, fmt, dpi) for fmt in formats}
+        except OSError as e:
+            # without a key the job is drawn as if there was no cache, and its error (if any) comes from drawing it
+            result['cache_error'] = '{}: {}'.format(type(e).__name__, e)
+            cache = None
+
+    if cache and not profile:
+        try:
+            cached = {fmt: cache.get(keys[fmt], fmt) for fmt in formats}
+            if all(data is not None for data in cached.values()):
+                for fmt, data in cached.items():
+                    path = os.path.join(out_dir, '{}.{}'.format(name, fmt))
+                    with open(path, 'wb') as f:
+                        f.write(data)
+                    result['files'].append(path)
+                result.update(status='ok', cached=True, wall_time=time.perf_counter() - start,
+                              peak_rss=peak_rss_bytes())
+                return result
+        except OSError as e:
+            result['cache_error'] = '{}: {}'.format(type(e).__name__, e)
+            result['files'] = []
+
+    profiler = FigureProfiler(trace_memory=profile)
+    fig = Figure(dpi=dpi)
+    FigureCanvasAgg(fig)
+    try:
+        with profiler.figure(name, fig if profile else None) as record:
+            with record.phase('build'):
+                figure_jobs.JOBS[name](fig, figure_jobs.job_rng(name, seed))
+            if profile:
+                record.draw(fig)
+            for fmt in formats:
+                path = os.path.join(out_dir, '{}.{}'.format(name, fmt))
+                # the svg and pdf backends stamp the current date into the file unless we leave it out
+                metadata = {'Date': None} if fmt in ('svg', 'pdf') else None
+                with record.phase('save ' + fmt):
+                    fig.savefig(path, format=fmt, metadata=metadata)
+                result['files'].append(path)
+                if cache:
+                    # the figure is written either way, a cache that can't be written to only costs the next run
+                    try:
+                        with open(path, 'rb') as f:
+                            cache.put(keys[fmt], fmt, f.read())
+                    except OSError as e:
+                        result['cache_error'] = '{}: {}'.format(type(e).__name__, e)
+        result['status'] = 'ok'
+        result['cached'] = False
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = '{}: {}'.format(type(e).__name__, e)
+    result['wall_time'] = time.perf_counter() - start
+    result['peak_rss'] = peak_rss_bytes()
+    if profile:
+        result['profile'] = profiler.to_dicts()[0]
+    return result
+
+
+# render the named jobs (all of them if names is empty) and return one result dict per job, in the order given.
+# Every worker process only renders one job, so peak_rss belongs to that job alone. With profile=True each result also
+# has a 'profile' with the timings, allocations and artist counts of the job (see profiling.py).
+def render_all(names=None, out_dir='figures', formats=('png',), workers=None, dpi=100, seed=123, profile=False,
+               cache_dir=None, cache_bytes=512 * 2**20):
+    import figure_jobs
+    names = list(names or figure_jobs.JOBS)
+    unknown = [name for name in names if name not in figure_jobs.JOBS]
+    if unknown:
+        raise KeyError('unknown figure jobs: {}'.format(', '.join(unknown)))
+    os.makedirs(out_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+        futures = [pool.submit(render_job, name, out_dir, tuple(formats), dpi, seed, profile, cache_dir, cache_bytes)
+                   for name in names]
+        return [future.result() for future in futures]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render the figure jobs headlessly across a process pool.')
+    parser.add_argument('jobs', nargs='*', help='jobs to render, default is all of them')
+    parser.add_argument('--out', default='figures', help='output directory')
+    parser.add_argument('--formats', nargs='+', default=['png'], help='png, svg, pdf, ...')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes, default is one per core')
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=123)
+    parser.add_argument('--report', help='also write the results as JSON to this file')
+    parser.add_argument('--profile', action='store_true', help='record phase timings, allocations and artist counts')
+    parser.add_argument('--trace', help='write the profiles as a Chrome trace to this file (implies --profile)')
+    parser.add_argument('--cache', help='directory of the figure cache, unchanged figures are copied from there')
+    parser.add_argument('--cache-size', type=float, default=512, help='size limit of the cache in MB')
+    parser.add_argument('--list', action='store_true', help='list the available jobs and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        import figure_jobs
+        print('\n'.join(figure_jobs.JOBS))
+        return 0
+
+    profile = args.profile or args.trace is not None
+    results = render_all(args.jobs, args.out, args.formats, args.workers, args.dpi, args.seed, profile,
+                         args.cache, int(args.cache_size * 2**20))
+    for r in results:
+        line = '{:<28} {:>8.3f}s {:>8.1f} MB  {}'.format(r['job'], r['wall_time'], r['peak_rss'] / 2**20, r['status'])
+        if r['status'] != 'ok':
+            line += '  ' + r['error']
+        elif r.get('cached'):
+            line += '  (cached)'
+        print(line)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.trace:
+        from profiling import write_trace
+        write_trace([r['profile'] for r in results if 'profile' in r], args.trace)
+    return 0 if all(r['status'] == 'ok' for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
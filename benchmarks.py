@@ -0,0 +1,333 @@
+# BENCHMARKS
+
+# Every kind of chart the scripts show (plot and scatter, lines and dates, bars, subplots, histograms, GridSpec
+# marginals, box plots, hist2d, inset axes, animation, picking and clicking, and the pandas plot kinds) has a benchmark
+# here. A benchmark builds its chart for n data points, and we time building it, time drawing it to each output format
+# (Agg for png, svg and pdf), and keep the size of the output and the peak memory of the process.
+
+# Each (chart, size, format) case runs in a fresh process, so the peak memory belongs to that case alone. A case is run
+# once to warm up (imports, font cache, the first Agg renderer) and then timed repeats times, and the fastest of those
+# is kept: a single sub-second timing moves by more than the regression threshold from one run to the next, the
+# minimum of a few hardly does. The results are saved as JSON, and a later run can be compared against a saved one, any
+# case that got slower or bigger than the threshold allows is flagged as a regression.
+
+#   python benchmarks.py --sizes 1000 100000 --formats png svg --save results/today.json
+#   python benchmarks.py --charts hist scatter --compare results/today.json --threshold 0.2
+
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from batch_render import peak_rss_bytes
+
+BENCHMARKS = {}
+
+
+# decorator that registers a benchmark. Sizes above max_n are skipped, for charts whose cost grows so fast that the big
+# sizes would run for hours.
+def bench(name, max_n=None):
+    def register(func):
+        BENCHMARKS[name] = (func, max_n)
+        return func
+    return register
+
+
+def walk_frame(rng, n, columns='ABC'):
+    return pd.DataFrame({c: rng.standard_normal(n).cumsum() for c in columns},
+                        index=pd.date_range('1/1/2017', periods=n, freq='min'))
+
+
+@bench('plot')
+def plot(fig, rng, n):
+    fig.add_subplot().plot(rng.random(n), rng.random(n), 'o')
+
+
+@bench('scatter')
+def scatter(fig, rng, n):
+    fig.add_subplot().scatter(rng.random(n), rng.random(n), s=100, c=rng.random(n))
+
+
+@bench('line')
+def line(fig, rng, n):
+    linear_data = np.arange(n)
+    ax = fig.add_subplot()
+    ax.plot(linear_data, '-o', linear_data**2, '-o')
+    ax.fill_between(range(n), linear_data, linear_data**2, facecolor='blue', alpha=0.25)
+
+
+@bench('dates')
+def dates(fig, rng, n):
+    observation_dates = np.arange('2017-01-01', n, dtype='datetime64[s]')
+    ax = fig.add_subplot()
+    ax.plot(observation_dates, rng.standard_normal(n).cumsum(), '-o')
+    for item in ax.xaxis.get_ticklabels():
+        item.set_rotation(45)
+
+
+@bench('bar', max_n=10**5)
+def bar(fig, rng, n):
+    ax = fig.add_subplot()
+    xvals = np.arange(n)
+    ax.bar(xvals, rng.random(n), width=0.3, yerr=rng.random(n))
+    ax.bar(xvals + 0.3, rng.random(n), width=0.3, color='red')
+
+
+@bench('barh', max_n=10**5)
+def barh(fig, rng, n):
+    fig.add_subplot().barh(np.arange(n), rng.random(n), height=0.3)
+
+
+@bench('stacked_bar', max_n=10**5)
+def stacked_bar(fig, rng, n):
+    ax = fig.add_subplot()
+    bottom = rng.random(n)
+    ax.bar(np.arange(n), bottom, width=0.3, color='b')
+    ax.bar(np.arange(n), rng.random(n), width=0.3, bottom=bottom, color='r')
+
+
+@bench('subplots')
+def subplots(fig, rng, n):
+    axs = fig.subplots(3, 3, sharex=True, sharey=True)
+    for ax in axs.flat:
+        ax.plot(rng.random(n), '-')
+        ax.tick_params(labelbottom=True, labelleft=True)
+
+
+@bench('hist')
+def hist(fig, rng, n):
+    for ax in fig.subplots(2, 2, sharex=True).flat:
+        ax.hist(rng.normal(size=n), bins=100)
+
+
+@bench('gridspec_marginals')
+def gridspec_marginals(fig, rng, n):
+    gspec = fig.add_gridspec(3, 3)
+    X, Y = rng.random(n), rng.normal(size=n)
+    fig.add_subplot(gspec[1:, 1:]).scatter(X, Y)
+    fig.add_subplot(gspec[0, 1:]).hist(X, bins=100)
+    fig.add_subplot(gspec[1:, 0]).hist(Y, bins=100, orientation='horizontal')
+
+
+@bench('boxplot')
+def boxplot(fig, rng, n):
+    fig.add_subplot().boxplot([rng.normal(size=n), rng.random(n), rng.gamma(2, size=n)])
+
+
+@bench('hist2d')
+def hist2d(fig, rng, n):
+    ax = fig.add_subplot()
+    _, _, _, image = ax.hist2d(rng.random(n), rng.normal(size=n), bins=100)
+    fig.colorbar(image, ax=ax)
+
+
+@bench('inset')
+def inset(fig, rng, n):
+    import mpl_toolkits.axes_grid1.inset_locator as mpl_il
+    gamma = rng.gamma(2, size=n)
+    ax = fig.add_subplot()
+    ax.boxplot([rng.normal(size=n), rng.random(n), gamma], whis=10000.0)
+    mpl_il.inset_axes(ax, width='60%', height='40%', loc=2).hist(gamma, bins=100)
+
+
+# ten frames of the animation in coursera_week3.py, each one clearing the axes and binning x[:curr] again
+@bench('animation', max_n=10**6)
+def animation(fig, rng, n):
+    x = rng.standard_normal(n)
+    ax = fig.add_subplot()
+    for curr in np.linspace(n // 10, n, 10).astype(int):
+        ax.cla()
+        ax.hist(x[:curr], bins=np.arange(-4, 4, 0.5))
+        ax.annotate('n = {}'.format(curr), [3, 27])
+        fig.canvas.draw()
+
+
+# ten picks on a scatter with picker=5, the hit test that runs for every click
+@bench('pick')
+def pick(fig, rng, n):
+    from matplotlib.backend_bases import MouseEvent
+    ax = fig.add_subplot()
+    points = ax.scatter(rng.random(n), rng.random(n), picker=5)
+    fig.canvas.draw()
+    for x, y in rng.random((10, 2)) * [fig.bbox.width, fig.bbox.height]:
+        points.contains(MouseEvent('button_press_event', fig.canvas, x, y))
+
+
+# ten clicks handled like onclick in coursera_week3.py, clearing and plotting the data again each time
+@bench('click')
+def click(fig, rng, n):
+    data = rng.random(n)
+    ax = fig.add_subplot()
+    for i in range(10):
+        ax.cla()
+        ax.plot(data)
+        ax.set_title('Event {}'.format(i))
+        fig.canvas.draw()
+
+
+@bench('pandas_line')
+def pandas_line(fig, rng, n):
+    walk_frame(rng, n).plot(ax=fig.add_subplot())
+
+
+@bench('pandas_scatter')
+def pandas_scatter(fig, rng, n):
+    df = walk_frame(rng, n)
+    df.plot.scatter('A', 'C', c='B', s=df['B'].abs(), colormap='viridis', ax=fig.add_subplot())
+
+
+@bench('pandas_box')
+def pandas_box(fig, rng, n):
+    walk_frame(rng, n).plot.box(ax=fig.add_subplot())
+
+
+@bench('pandas_hist')
+def pandas_hist(fig, rng, n):
+    walk_frame(rng, n).plot.hist(alpha=0.7, ax=fig.add_subplot())
+
+
+@bench('pandas_kde', max_n=10**5)
+def pandas_kde(fig, rng, n):
+    walk_frame(rng, n).plot.kde(ax=fig.add_subplot())
+
+
+@bench('scatter_matrix', max_n=10**6)
+def scatter_matrix(fig, rng, n):
+    pd.plotting.scatter_matrix(walk_frame(rng, n, 'ABCD'), ax=fig.subplots(4, 4))
+
+
+@bench('parallel_coordinates', max_n=10**5)
+def parallel_coordinates(fig, rng, n):
+    df = pd.DataFrame(rng.random((n, 4)), columns=list('ABCD'))
+    df['species'] = rng.choice(['setosa', 'versicolor', 'virginica'], size=n)
+    pd.plotting.parallel_coordinates(df, 'species', ax=fig.add_subplot())
+
+
+def run_case(chart, n, fmt, seed=123, repeats=5):
+    import matplotlib
+    matplotlib.use('Agg')
+
+    result = {'chart': chart, 'n': n, 'format': fmt}
+    func, max_n = BENCHMARKS[chart]
+    if max_n is not None and n > max_n:
+        result['status'] = 'skipped'
+        return result
+    try:
+        # the first run is the warm-up and isn't counted
+        timings = [time_case(func, n, fmt, seed) for _ in range(repeats + 1)][1:]
+        construct_times, draw_times, sizes = zip(*timings)
+        result['construct_time'] = min(construct_times)
+        result['draw_time'] = min(draw_times)
+        result['construct_times'] = list(construct_times)
+        result['draw_times'] = list(draw_times)
+        result['output_size'] = sizes[-1]
+        result['status'] = 'ok'
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = '{}: {}'.format(type(e).__name__, e)
+    result['peak_rss'] = peak_rss_bytes()
+    return result
+
+
+# build the chart in a new figure and save it once, returns (construct time, draw time, output size)
+def time_case(func, n, fmt, seed):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    func(fig, rng, n)
+    construct_time = time.perf_counter() - start
+
+    buffer = io.BytesIO()
+    start = time.perf_counter()
+    fig.savefig(buffer, format=fmt)
+    return construct_time, time.perf_counter() - start, buffer.tell()
+
+
+def run(charts=None, sizes=(10**3, 10**4, 10**5), formats=('png', 'svg', 'pdf'), workers=None, seed=123, repeats=5):
+    charts = list(charts or BENCHMARKS)
+    unknown = [chart for chart in charts if chart not in BENCHMARKS]
+    if unknown:
+        raise KeyError('unknown benchmarks: {}'.format(', '.join(unknown)))
+    cases = [(chart, n, fmt) for chart in charts for n in sizes for fmt in formats]
+    # one process per case, so nothing a case allocates is still around for the next one
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+        futures = [pool.submit(run_case, chart, n, fmt, seed, repeats) for chart, n, fmt in cases]
+        return [future.result() for future in futures]
+
+
+def metadata():
+    import matplotlib
+    return {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+            'platform': platform.platform(), 'matplotlib': matplotlib.__version__, 'numpy': np.__version__,
+            'pandas': pd.__version__}
+
+
+# the cases that got worse than baseline by more than threshold (0.2 is 20%) in any of the metrics. The times compared
+# are the fastest of each case's repeats.
+def regressions(results, baseline, threshold=0.2, metrics=('construct_time', 'draw_time', 'output_size', 'peak_rss')):
+    old = {(r['chart'], r['n'], r['format']): r for r in baseline if r.get('status') == 'ok'}
+    flagged = []
+    for r in results:
+        before = old.get((r['chart'], r['n'], r['format']))
+        if r.get('status') != 'ok' or before is None:
+            continue
+        for metric in metrics:
+            if before[metric] > 0 and r[metric] > before[metric] * (1 + threshold):
+                flagged.append({'chart': r['chart'], 'n': r['n'], 'format': r['format'], 'metric': metric,
+                                'before': before[metric], 'after': r[metric], 'ratio': r[metric] / before[metric]})
+    return flagged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark every chart type in the scripts.')
+    parser.add_argument('--charts', nargs='+', help='benchmarks to run, default is all of them')
+    parser.add_argument('--sizes', nargs='+', type=lambda s: int(float(s)), default=[10**3, 10**4, 10**5],
+                        help='numbers of data points, e.g. 1e3 1e7')
+    parser.add_argument('--formats', nargs='+', default=['png', 'svg', 'pdf'])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=123)
+    parser.add_argument('--repeats', type=int, default=5,
+                        help='timed runs per case after a warm-up, the fastest is kept')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON file of an earlier run to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown or growth, 0.2 is 20%%')
+    parser.add_argument('--list', action='store_true', help='list the available benchmarks and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print('\n'.join(BENCHMARKS))
+        return 0
+
+    results = run(args.charts, args.sizes, args.formats, args.workers, args.seed, args.repeats)
+    for r in results:
+        if r['status'] == 'ok':
+            print('{chart:<22} {n:>10} {format:<4} build {construct_time:8.3f}s  draw {draw_time:8.3f}s  '
+                  '{size:10.1f} kB  {rss:8.1f} MB'.format(size=r['output_size'] / 1024, rss=r['peak_rss'] / 2**20, **r))
+        else:
+            print('{:<22} {:>10} {:<4} {} {}'.format(r['chart'], r['n'], r['format'], r['status'], r.get('error', '')))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'meta': metadata(), 'results': results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        flagged = regressions(results, baseline, args.threshold)
+        for r in flagged:
+            print('REGRESSION {chart} n={n} {format}: {metric} {before:.4g} -> {after:.4g} ({ratio:.2f}x)'.format(**r))
+        return 1 if flagged else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# BLITTING REDRAWS FOR EVENT HANDLERS
+
+# The onclick handler in coursera_week3.py clears the axes with plt.cla() and plots data again, just so it can put the
+# position of the click in the title. Every click throws away every artist, builds them again and asks for a full redraw
+# of the figure, and with a fast stream of clicks or mouse moves those full redraws queue up behind each other.
+
+# BlitRedraw only redraws the artists that change. They are marked as animated, which makes the normal draw skip them.
+# After each full draw we save a copy of the rendered figure without them (the background), and to update them we paste
+# the background back, draw just those artists on top, and blit the result to the screen.
+
+# Requests for a redraw don't draw anything straight away. The first one starts a timer that runs out after one frame,
+# and everything that changed before then is drawn together, so there is at most one draw per frame however many events
+# come in. Only rebuild() does a full draw, for when the data itself changes.
+
+class BlitRedraw:
+
+    # canvas is the figure's canvas, artists the ones that change (like ax.title), frame_interval is in milliseconds
+    def __init__(self, canvas, artists=(), frame_interval=16):
+        self.canvas = canvas
+        self.artists = []
+        self._background = None
+        self._pending = False
+        for artist in artists:
+            self.add_artist(artist)
+        self._cid = canvas.mpl_connect('draw_event', self._on_draw)
+        self._timer = canvas.new_timer(interval=frame_interval)
+        self._timer.single_shot = True
+        self._timer.add_callback(self.flush)
+
+    def add_artist(self, artist):
+        if artist.figure is not self.canvas.figure:
+            raise ValueError('the artist is not in the figure of this canvas')
+        artist.set_animated(True)
+        self.artists.append(artist)
+
+    # a full draw just happened (window resized, data rebuilt, ...), keep what it drew as the new background
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        figure = self.canvas.figure
+        for artist in self.artists:
+            figure.draw_artist(artist)
+
+    # ask for the changed artists to be redrawn within the next frame, call this from event handlers
+    def request(self):
+        if not self._pending:
+            self._pending = True
+            self._timer.start()
+
+    # redraw the changed artists now
+    def flush(self):
+        self._pending = False
+        if self._background is None:
+            # nothing has been drawn yet, the full draw will call _on_draw and draw the artists too
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_artists()
+            self.canvas.blit(self.canvas.figure.bbox)
+        self.canvas.flush_events()
+
+    # the data changed, so the background has to be drawn again
+    def rebuild(self):
+        self._background = None
+        self.canvas.draw_idle()
+
+    def disconnect(self):
+        self._timer.stop()
+        self.canvas.mpl_disconnect(self._cid)
@@ -0,0 +1,118 @@
+# BOX PLOT STATISTICS CACHE
+
+# In coursera_week3.py plt.boxplot is called four times on the same three columns of df, with whis=10000.0 and with the
+# default whiskers. Each call works out the quartiles, whiskers and fliers of every column again from scratch, even
+# though only the styling changes between calls.
+
+# Axes.bxp is the part of boxplot that does the drawing, it takes a list of already computed statistics (one dict per
+# box, in the same format as matplotlib.cbook.boxplot_stats). BoxStatsCache computes those dicts and remembers them, so
+# drawing the same data again with different styling, or on a different axes, doesn't look at the data at all.
+
+# The quartiles only depend on the column, so they are cached per column, and for columns of the same length they are
+# computed for all the columns in one np.percentile call. The whiskers and fliers also depend on whis, so they are
+# cached per column and whis. Neither needs a sort of the data, both are O(n).
+
+# A column is recognised by the memory it points to (see ColumnCache in array_helpers.py), so df['normal'] is the same
+# column every time it's looked up. If the values of a column are changed in place, pass a new version (or call clear),
+# otherwise the old stats are reused. The cache keeps at most max_columns columns, the least recently used ones are
+# dropped first.
+
+import numpy as np
+
+from array_helpers import ColumnCache
+
+
+class BoxStatsCache:
+
+    def __init__(self, max_columns=256):
+        self._quartiles = ColumnCache(max_columns)
+        # one entry per column and whis, fliers can be big, so these are bounded too
+        self._whiskers = ColumnCache(max_columns)
+
+    def clear(self):
+        self._quartiles.clear()
+        self._whiskers.clear()
+
+    # returns one stats dict per column, ready to pass to Axes.bxp.
+    # whis is either a float, the whiskers go out to the furthest point within whis * IQR of the box, or a pair of
+    # percentiles like (5, 95), the same as in plt.boxplot.
+    def stats(self, columns, whis=1.5, labels=None, version=0):
+        columns = [np.asarray(column).ravel() for column in columns]
+        if labels is None:
+            labels = range(1, len(columns) + 1)
+        whis_key = tuple(whis) if np.iterable(whis) else float(whis)
+
+        quartiles = self._fill_quartiles(columns, version)
+
+        stats = []
+        for column, base, label in zip(columns, quartiles, labels):
+            ends = self._whiskers.get(column, whis_key, version)
+            if ends is None:
+                ends = self._whiskers.put(column, whiskers(column, base, whis), whis_key, version)
+            stats.append(dict(base, **ends, label=label))
+        return stats
+
+    # draw a box plot of columns on ax from the cached stats, extra keyword arguments go to Axes.bxp
+    def boxplot(self, ax, columns, whis=1.5, labels=None, version=0, **bxp_kwargs):
+        return ax.bxp(self.stats(columns, whis=whis, labels=labels, version=version), **bxp_kwargs)
+
+    # the quartiles of every column, the ones that aren't cached yet are worked out together
+    def _fill_quartiles(self, columns, version):
+        quartiles = [self._quartiles.get(column, version=version) for column in columns]
+        missing = {}
+        for i, (column, found) in enumerate(zip(columns, quartiles)):
+            if found is None:
+                missing.setdefault(len(column), []).append(i)
+
+        for n, group in missing.items():
+            if n == 0:
+                for i in group:
+                    quartiles[i] = self._quartiles.put(columns[i], empty_quartiles(), version=version)
+                continue
+            # all the columns of the same length go through percentile and mean together
+            data = np.column_stack([columns[i] for i in group])
+            q1, med, q3 = np.percentile(data, [25, 50, 75], axis=0)
+            means = data.mean(axis=0)
+            for j, i in enumerate(group):
+                iqr = q3[j] - q1[j]
+                quartiles[i] = self._quartiles.put(columns[i], {
+                    'mean': means[j], 'q1': q1[j], 'med': med[j], 'q3': q3[j], 'iqr': iqr,
+                    # notch confidence interval around the median, the same as boxplot_stats without bootstrapping
+                    'cilo': med[j] - 1.57 * iqr / np.sqrt(n),
+                    'cihi': med[j] + 1.57 * iqr / np.sqrt(n),
+                }, version=version)
+        return quartiles
+
+
+def empty_quartiles():
+    return {'mean': np.nan, 'q1': np.nan, 'med': np.nan, 'q3': np.nan, 'iqr': np.nan, 'cilo': np.nan, 'cihi': np.nan}
+
+
+# whisker ends and fliers of one column, following matplotlib.cbook.boxplot_stats
+def whiskers(column, base, whis):
+    if len(column) == 0:
+        return {'whislo': np.nan, 'whishi': np.nan, 'fliers': np.array([])}
+    q1, q3, iqr = base['q1'], base['q3'], base['iqr']
+    if np.iterable(whis):
+        loval, hival = np.percentile(column, whis)
+    else:
+        loval = q1 - whis * iqr
+        hival = q3 + whis * iqr
+
+    # the whiskers stop at the last data point inside the limits, but never inside the box
+    below = column[column <= hival]
+    whishi = q3 if len(below) == 0 or below.max() < q3 else below.max()
+    above = column[column >= loval]
+    whislo = q1 if len(above) == 0 or above.min() > q1 else above.min()
+
+    # low fliers first, then high ones, like boxplot_stats
+    fliers = np.concatenate([column[column < whislo], column[column > whishi]])
+    return {'whislo': whislo, 'whishi': whishi, 'fliers': fliers}
+
+
+# a cache shared by everything that imports this module
+default_cache = BoxStatsCache()
+
+
+def boxplot(ax, columns, whis=1.5, labels=None, version=0, **bxp_kwargs):
+    return default_cache.boxplot(ax, columns, whis=whis, labels=labels, version=version, **bxp_kwargs)
@@ -0,0 +1,159 @@
+# CACHED INSETS
+
+# In coursera_week3.py an inset made with mpl_il.inset_axes(plt.gca(), width='60%', height='40%', loc=2) sits on top of
+# the box plot, and ax2.hist(df['gamma'], bins=100) bins a column the box plot has just gone over. The inset is a
+# normal axes, so its bars, ticks and labels are drawn again every time the figure is drawn, and in an overview + detail
+# figure that is every time the main view is panned or zoomed, even though nothing in the inset has changed.
+
+# A CachedInset draws its contents once, into a separate Figure with an Agg canvas the size of the inset, and keeps the
+# pixels. On every draw of the parent figure the kept pixels are just copied into place. The contents are drawn again
+# only when something they depend on changes: the inputs (given with set_inputs, or call invalidate after changing one
+# in place), the size of the inset in pixels, or the matplotlib style. Checking all that on every draw costs a few
+# comparisons, the inputs and the drawing function are compared by identity and rcParams against a copy taken at the
+# last render.
+
+# The inset is meant to be drawn from what has already been worked out for the parent, not from the raw data again:
+# hist_inset draws bin counts (from np.histogram, a FrameStats column or a StreamingHistogram), and overview_inset draws
+# a min/max downsampled copy of a long series, with a box showing what the parent axes is looking at. That box moves
+# with the parent's view, so it is drawn live on top of the cached pixels.
+
+import numpy as np
+import matplotlib.artist as martist
+from matplotlib.patches import Rectangle
+from matplotlib.transforms import Affine2D, Bbox, IdentityTransform
+
+
+class CachedInset(martist.Artist):
+
+    # draw(ax, *inputs, **kwargs) draws the contents of the inset into ax, an axes in a separate figure.
+    # bounds is [x0, y0, width, height] of the inset in parent axes coordinates, like Axes.inset_axes, and pad is the
+    # room around it in points for the tick labels of the inset.
+    def __init__(self, parent, draw, *inputs, bounds=(0.02, 0.55, 0.55, 0.4), pad=28, **kwargs):
+        super().__init__()
+        self.parent = parent
+        self.draw_contents = draw
+        self.inputs = inputs
+        self.kwargs = kwargs
+        self.bounds = bounds
+        self.pad = pad
+        self.version = 0
+        self.renders = 0
+        self._key = None
+        self._rendered = None
+        self._rc = None
+        self._pixels = None
+        self._data_transform = None
+        self.overlays = []
+        self.set_zorder(10)
+        parent.add_artist(self)
+
+    # draw the contents again on the next draw, for when an input was changed in place
+    def invalidate(self):
+        self.version += 1
+        self.stale = True
+
+    def set_inputs(self, *inputs, **kwargs):
+        self.inputs = inputs
+        self.kwargs.update(kwargs)
+        self.invalidate()
+
+    # the inset's box in display pixels
+    def window_extent(self):
+        return Bbox.from_bounds(*self.bounds).transformed(self.parent.transAxes)
+
+    def get_window_extent(self, renderer=None):
+        return self.window_extent()
+
+    def _render(self, width, height, pad_px, dpi):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        fig_width, fig_height = width + 2 * pad_px, height + 2 * pad_px
+        fig = Figure(figsize=(fig_width / dpi, fig_height / dpi), dpi=dpi)
+        canvas = FigureCanvasAgg(fig)
+        fig.patch.set_alpha(0)
+        ax = fig.add_axes([pad_px / fig_width, pad_px / fig_height, width / fig_width, height / fig_height])
+        self.draw_contents(ax, *self.inputs, **self.kwargs)
+        canvas.draw()
+        # draw_image takes the rows from the bottom up, the canvas buffer has them from the top down
+        self._pixels = np.asarray(canvas.buffer_rgba())[::-1].copy()
+        # data coordinates of the inset to pixels of the rendered image, for drawing the overlays
+        self._data_transform = ax.transData.frozen()
+        self.renders += 1
+
+    @martist.allow_rasterization
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        import matplotlib as mpl
+        box = self.window_extent()
+        width, height = max(int(round(box.width)), 1), max(int(round(box.height)), 1)
+        dpi = self.parent.figure.dpi
+        pad_px = int(round(self.pad * dpi / 72))
+        key = (self.version, width, height, pad_px, dpi)
+        rendered = (self.inputs, self.draw_contents)
+        # dict's own == looks at the stored values directly, without going through RcParams' lookups
+        if (key != self._key or self._rendered is None or any(a is not b for a, b in zip(rendered, self._rendered))
+                or not dict.__eq__(self._rc, mpl.rcParams)):
+            self._rc = dict.copy(mpl.rcParams)
+            with mpl.rc_context({'figure.dpi': dpi}):
+                self._render(width, height, pad_px, dpi)
+            self._key = key
+            self._rendered = rendered
+
+        x0, y0 = int(round(box.x0)) - pad_px, int(round(box.y0)) - pad_px
+        gc = renderer.new_gc()
+        gc.set_alpha(self.get_alpha() if self.get_alpha() is not None else 1.0)
+        renderer.draw_image(gc, x0, y0, self._pixels)
+        gc.restore()
+
+        to_display = self._data_transform + Affine2D().translate(x0, y0)
+        for overlay in self.overlays:
+            overlay(renderer, to_display)
+        self.stale = False
+
+
+# a histogram drawn from bin counts that have already been worked out, the same look as ax.hist
+def draw_counts(ax, counts, edges, orientation='vertical', **stairs_kwargs):
+    stairs_kwargs.setdefault('fill', True)
+    ax.stairs(counts, edges, orientation=orientation, **stairs_kwargs)
+    ax.set_xlim(edges[0], edges[-1]) if orientation == 'vertical' else ax.set_ylim(edges[0], edges[-1])
+
+
+def hist_inset(parent, counts, edges, bounds=(0.02, 0.55, 0.55, 0.4), ticks_right=True, margins=None, **stairs_kwargs):
+    def draw(ax, counts, edges, **kwargs):
+        draw_counts(ax, counts, edges, **kwargs)
+        if margins is not None:
+            # draw_counts fixed the limits to the edges, the margins need autoscaling back on
+            ax.set_autoscalex_on(True)
+            ax.margins(x=margins)
+            ax.autoscale_view()
+        if ticks_right:
+            ax.yaxis.tick_right()
+    return CachedInset(parent, draw, np.asarray(counts), np.asarray(edges), bounds=bounds, **stairs_kwargs)
+
+
+# a min/max downsampled copy of y against x, with a box over the x range the parent is showing
+def overview_inset(parent, x, y, bounds=(0.6, 0.7, 0.38, 0.28), pixels=400, box_color='red', **plot_kwargs):
+    from downsample import as_float_x, minmax_downsample
+    x, dates = as_float_x(x)
+    sx, sy = minmax_downsample(x, np.asarray(y, dtype=float), pixels)
+
+    def draw(ax, sx, sy, **kwargs):
+        ax.plot(sx, sy, **kwargs)
+        ax.set_xlim(sx[0], sx[-1])
+        if dates:
+            ax.xaxis_date()
+        ax.tick_params(labelsize='x-small')
+
+    inset = CachedInset(parent, draw, sx, sy, bounds=bounds, **plot_kwargs)
+    ylim = (np.nanmin(sy), np.nanmax(sy))
+
+    def view_box(renderer, to_display):
+        xmin, xmax = parent.get_xlim()
+        (x0, y0), (x1, y1) = to_display.transform([(xmin, ylim[0]), (xmax, ylim[1])])
+        box = Rectangle((x0, y0), x1 - x0, y1 - y0, transform=IdentityTransform(), fill=False, edgecolor=box_color)
+        box.set_figure(parent.figure)
+        box.draw(renderer)
+
+    inset.overlays.append(view_box)
+    return inset
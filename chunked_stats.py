@@ -0,0 +1,259 @@
+# CHUNKED COLUMN STATISTICS
+
+# coursera_week3.py calls df.describe() before its box plots, and coursera_week4.py calls df.plot.hist(alpha=0.7) and
+# df.plot.box(). All of them need the whole DataFrame in memory, and each one goes over every column again.
+
+# FrameStats goes over the data once, a chunk at a time, and keeps a small summary per column from which all three
+# can be drawn:
+
+#   count, mean and variance, updated with the parallel form of Welford's algorithm so chunks can be merged;
+#   min and max;
+#   a histogram with fixed bin edges, the same for every column like in df.plot.hist, when the range is known up front;
+#   a quantile sketch in the style of a t-digest, which keeps a few hundred weighted centroids, small ones near the ends
+#   of the distribution and bigger ones in the middle, so the quartiles and the median come out within a fraction of a
+#   percent of their rank.
+
+# Chunks can come from csv_chunks or parquet_chunks below, or any other iterator of DataFrames or dicts of arrays, and
+# summaries filled in different processes are merged with merge, so the size of the data is only limited by the disk.
+
+# Without the raw data the box plot can't list its fliers, so the whiskers are placed at the smallest and largest
+# sketched values inside the fences and the fliers are left out.
+
+import numpy as np
+
+from array_helpers import bin_index
+
+
+class QuantileSketch:
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+
+    # add a chunk of values, nan is ignored
+    def add(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self._compress(np.concatenate([self.means, values]),
+                           np.concatenate([self.weights, np.ones(len(values))]))
+        return self
+
+    def merge(self, other):
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return self
+
+    # sort the centroids and merge neighbours that fall in the same unit of the scale function
+    # k(q) = compression / (2 pi) * arcsin(2q - 1), which is steep near q = 0 and q = 1 so the tails stay detailed
+    def _compress(self, means, weights):
+        if len(means) == 0:
+            return
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights) / cumulative[-1]
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    @property
+    def count(self):
+        return self.weights.sum()
+
+    # approximate values at the quantiles q (between 0 and 1), lo and hi are the exact min and max if they are known
+    def quantile(self, q, lo=None, hi=None):
+        if len(self.means) == 0:
+            return np.full(np.shape(q), np.nan)
+        # each centroid stands for the rank at its middle, the min and max are pinned to ranks 0 and n
+        centers = np.cumsum(self.weights) - self.weights / 2
+        ranks = np.r_[0, centers, self.count]
+        values = np.r_[self.means[0] if lo is None else lo, self.means, self.means[-1] if hi is None else hi]
+        return np.interp(np.asarray(q) * self.count, ranks, values)
+
+    # approximate fraction of values at or below x
+    def cdf(self, x, lo=None, hi=None):
+        if len(self.means) == 0:
+            return np.zeros(np.shape(x))
+        centers = np.cumsum(self.weights) - self.weights / 2
+        ranks = np.r_[0, centers, self.count]
+        values = np.r_[self.means[0] if lo is None else lo, self.means, self.means[-1] if hi is None else hi]
+        return np.interp(x, values, ranks) / self.count
+
+
+class ColumnStats:
+
+    # edges are the fixed histogram bin edges, or None to read the histogram off the quantile sketch later
+    def __init__(self, edges=None, compression=200):
+        self.n = 0
+        self.nulls = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.edges = None if edges is None else np.asarray(edges, dtype=float)
+        self.counts = None if edges is None else np.zeros(len(edges) - 1, dtype=np.int64)
+        self.sketch = QuantileSketch(compression)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        finite = values[~np.isnan(values)]
+        self.nulls += len(values) - len(finite)
+        if len(finite) == 0:
+            return self
+        chunk = ColumnStats.__new__(ColumnStats)
+        chunk.n = len(finite)
+        chunk.mean = finite.mean()
+        chunk.m2 = ((finite - chunk.mean)**2).sum()
+        self._merge_moments(chunk)
+        self.min = min(self.min, finite.min())
+        self.max = max(self.max, finite.max())
+        if self.edges is not None:
+            index = bin_index(finite, self.edges)
+            inside = (index >= 0) & (index < len(self.counts))
+            self.counts += np.bincount(index[inside], minlength=len(self.counts))
+        self.sketch.add(finite)
+        return self
+
+    def merge(self, other):
+        if (self.edges is None) != (other.edges is None) or (
+                self.edges is not None and not np.array_equal(self.edges, other.edges)):
+            raise ValueError('can only merge column stats with the same bin edges')
+        self._merge_moments(other)
+        self.nulls += other.nulls
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if self.counts is not None:
+            self.counts += other.counts
+        self.sketch.merge(other.sketch)
+        return self
+
+    # Chan et al.'s update of count, mean and sum of squared deviations for two parts
+    def _merge_moments(self, other):
+        n = self.n + other.n
+        if n == 0:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta**2 * self.n * other.n / n
+        self.n = n
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan
+
+    def quantile(self, q):
+        return self.sketch.quantile(q, self.min, self.max)
+
+    # the histogram over edges, exact if the edges were fixed from the start, otherwise estimated from the sketch
+    def histogram(self, edges=None):
+        if edges is None or (self.edges is not None and np.array_equal(edges, self.edges)):
+            return self.counts, self.edges
+        edges = np.asarray(edges, dtype=float)
+        return np.diff(self.sketch.cdf(edges, self.min, self.max)) * self.n, edges
+
+    # the statistics of one box, in the format of matplotlib.cbook.boxplot_stats, without fliers
+    def box(self, whis=1.5, label=None):
+        q1, med, q3 = self.quantile([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        if np.iterable(whis):
+            lo, hi = self.quantile(np.asarray(whis) / 100)
+        else:
+            inside = self.sketch.means[(self.sketch.means >= q1 - whis * iqr) & (self.sketch.means <= q3 + whis * iqr)]
+            lo = self.min if q1 - whis * iqr <= self.min else inside.min(initial=q1)
+            hi = self.max if q3 + whis * iqr >= self.max else inside.max(initial=q3)
+        return {'label': label, 'mean': self.mean, 'med': med, 'q1': q1, 'q3': q3, 'iqr': iqr,
+                'cilo': med - 1.57 * iqr / np.sqrt(self.n), 'cihi': med + 1.57 * iqr / np.sqrt(self.n),
+                'whislo': lo, 'whishi': hi, 'fliers': np.empty(0)}
+
+
+class FrameStats:
+
+    # bins is the number of histogram bins, range the (min, max) they cover. With range=None the histograms are read
+    # off the quantile sketches instead, over the min and max of all the columns, which is close but not exact.
+    def __init__(self, columns, bins=10, range=None, compression=200):
+        self.bins = bins
+        edges = None if range is None else np.linspace(range[0], range[1], bins + 1)
+        self.columns = {name: ColumnStats(edges, compression) for name in columns}
+
+    # add a chunk, a DataFrame or a dict of arrays with (at least) the columns being summarised
+    def add(self, chunk):
+        for name, stats in self.columns.items():
+            stats.add(np.asarray(chunk[name]))
+        return self
+
+    def add_chunks(self, chunks):
+        for chunk in chunks:
+            self.add(chunk)
+        return self
+
+    def merge(self, other):
+        for name, stats in self.columns.items():
+            stats.merge(other.columns[name])
+        return self
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    # the same table as DataFrame.describe()
+    def describe(self, percentiles=(0.25, 0.5, 0.75)):
+        import pandas as pd
+        index = ['count', 'mean', 'std', 'min'] + ['{:g}%'.format(100 * p) for p in percentiles] + ['max']
+        return pd.DataFrame({name: [float(s.n), s.mean, s.std, s.min, *s.quantile(list(percentiles)), s.max]
+                             for name, s in self.columns.items()}, index=index)
+
+    # the bin edges shared by all the columns
+    def edges(self):
+        first = next(iter(self.columns.values()))
+        if first.edges is not None:
+            return first.edges
+        lo = min(s.min for s in self.columns.values())
+        hi = max(s.max for s in self.columns.values())
+        return np.linspace(lo, hi, self.bins + 1)
+
+    # df.plot.hist() from the summaries, keyword arguments go to Axes.hist
+    def hist(self, ax, legend=True, **hist_kwargs):
+        edges = self.edges()
+        result = []
+        for name, stats in self.columns.items():
+            counts, _ = stats.histogram(edges)
+            result.append(ax.hist(edges[:-1], bins=edges, weights=counts, label=name, **hist_kwargs))
+        ax.set_ylabel('Frequency')
+        if legend:
+            ax.legend()
+        return result
+
+    # df.plot.box() or plt.boxplot(..., whis=whis) from the summaries, keyword arguments go to Axes.bxp
+    def boxplot(self, ax, whis=1.5, **bxp_kwargs):
+        return ax.bxp([s.box(whis, label=name) for name, s in self.columns.items()], **bxp_kwargs)
+
+
+# summarise several chunk iterators in a process pool and merge the results.
+# make_chunks(i) has to return the i-th iterator, it is called inside the worker so the data is read there.
+def summarize_parallel(make_chunks, parts, columns, bins=10, range=None, compression=200, workers=None):
+    from concurrent.futures import ProcessPoolExecutor
+    total = FrameStats(columns, bins, range, compression)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(summarize_part, make_chunks, i, columns, bins, range, compression)
+                   for i in np.arange(parts)]
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+
+def summarize_part(make_chunks, i, columns, bins, range, compression):
+    return FrameStats(columns, bins, range, compression).add_chunks(make_chunks(i))
+
+
+# DataFrames of chunksize rows of a csv file, only the listed columns are parsed
+def csv_chunks(path, columns=None, chunksize=1000000):
+    import pandas as pd
+    yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+
+# dicts of column arrays from a parquet file, one record batch at a time (this needs pyarrow)
+def parquet_chunks(path, columns=None, chunk_size=1000000):
+    import pyarrow.parquet as pq
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+        yield {name: batch.column(name).to_numpy(zero_copy_only=False) for name in batch.schema.names}
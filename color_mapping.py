@@ -0,0 +1,168 @@
+# VECTORIZED COLOR AND SIZE MAPPING
+
+# coursera_week2.py colors its scatter points with a list of strings, ['green']*(len(x)-1) plus 'red', and matplotlib
+# turns every one of those strings into RGBA on its own. coursera_week4.py colors and sizes the points by column B with
+# c='B', s=df['B'] and colormap='viridis', which normalizes the column and runs it through the colormap for every draw.
+# With a few points that doesn't matter, with millions of category-colored points converting the colors takes longer
+# than drawing them.
+
+# Here every color is worked out once, in a lookup table, and the points just index into it:
+
+#   ColorTable turns a short list of colors (one per category) into an (n, 4) RGBA array, and a whole array of category
+#   codes is colored with one fancy-indexing step;
+#   categorical_colors gives each distinct value its own code and color, in one np.unique call;
+#   colormap_table samples a colormap at 256 levels once and keeps the table, so numeric values are colored by scaling
+#   them to an integer level and indexing, with no per-point calls into the colormap;
+#   map_sizes scales numbers to marker areas in one vectorized expression.
+
+# scatter passes the finished (n, 4) float array to Axes.scatter, which matplotlib accepts as is.
+
+import functools
+
+import numpy as np
+
+
+class ColorTable:
+
+    # colors is a list of anything matplotlib accepts as a color
+    def __init__(self, colors, alpha=None):
+        from matplotlib.colors import to_rgba_array
+        self.table = to_rgba_array(colors, alpha)
+
+    def __len__(self):
+        return len(self.table)
+
+    # the RGBA colors of an array of codes, codes that are out of range or negative raise an IndexError
+    def __getitem__(self, codes):
+        return self.table[np.asarray(codes)]
+
+
+# the colors of the current property cycle, the ones plt.scatter would pick one after the other
+def cycle_colors():
+    import matplotlib as mpl
+    return mpl.rcParams['axes.prop_cycle'].by_key().get('color', ['C0'])
+
+
+# codes and colors for the distinct values of a column of categories.
+# Returns (categories, rgba), the palette is repeated if there are more categories than colors.
+def categorical_colors(values, palette=None, alpha=None):
+    categories, codes = np.unique(np.asarray(values), return_inverse=True)
+    palette = cycle_colors() if palette is None else palette
+    table = palette_table(tuple(palette), alpha)
+    return categories, table[codes.ravel() % len(table)]
+
+
+@functools.lru_cache(maxsize=64)
+def palette_table(palette, alpha=None):
+    return ColorTable(list(palette), alpha).table
+
+
+# the RGBA colors of an array of color names like ['green', 'green', 'red'], each distinct name is converted once.
+# Returns None if some of the values aren't colors.
+def named_colors(values, alpha=None):
+    from matplotlib.colors import is_color_like
+    names, codes = np.unique(np.asarray(values), return_inverse=True)
+    names = names.tolist()
+    if not all(isinstance(name, str) and is_color_like(name) for name in names):
+        return None
+    return palette_table(tuple(names), alpha)[codes.ravel()]
+
+
+# the RGBA colors of a colormap at n evenly spaced levels, with the colors for nan, under and over at the end.
+# cmap is a name or a Colormap. The tables of named colormaps are kept. A Colormap object is sampled again on every call,
+# since it can be changed afterwards (set_bad and so on), which is one call of the colormap on n values.
+def colormap_table(cmap='viridis', n=256):
+    if isinstance(cmap, str):
+        return named_colormap_table(cmap, n)
+    return sample_colormap(cmap, n)
+
+
+@functools.lru_cache(maxsize=64)
+def named_colormap_table(name, n=256):
+    import matplotlib as mpl
+    return sample_colormap(mpl.colormaps[name], n)
+
+
+def sample_colormap(colormap, n):
+    table = colormap(np.linspace(0, 1, n))
+    extras = np.array([colormap.get_bad(), colormap.get_under(), colormap.get_over()])
+    table = np.concatenate([table, extras])
+    table.flags.writeable = False
+    return table
+
+
+# colors for numbers through a colormap, values are scaled linearly from [vmin, vmax] (default: their min and max).
+# Values below vmin and above vmax get the under and over colors of the colormap, nan gets its bad color.
+def map_colors(values, cmap='viridis', vmin=None, vmax=None, n=256, alpha=None):
+    values = np.asarray(values, dtype=float)
+    vmin = np.nanmin(values) if vmin is None else vmin
+    vmax = np.nanmax(values) if vmax is None else vmax
+    table = colormap_table(cmap, n)
+    scale = n / (vmax - vmin) if vmax > vmin else 0.0
+    with np.errstate(invalid='ignore'):
+        level = np.floor((values - vmin) * scale)
+        # the top of the range belongs to the last level, like in Colormap.__call__
+        level[values == vmax] = n - 1
+        level[values < vmin] = n + 1
+        level[values > vmax] = n + 2
+    level[np.isnan(values)] = n
+    rgba = table[level.astype(np.intp)]
+    if alpha is not None:
+        rgba[:, 3] = alpha
+    return rgba
+
+
+# marker areas for numbers: values from [vmin, vmax] (default: their min and max) are scaled to [smin, smax].
+# With smin=None the values are used as areas directly, like s=df['B'], and only negative ones are clipped to 0.
+def map_sizes(values, smin=None, smax=None, vmin=None, vmax=None):
+    values = np.asarray(values, dtype=float)
+    if smin is None:
+        return np.clip(values, 0, None)
+    vmin = np.nanmin(values) if vmin is None else vmin
+    vmax = np.nanmax(values) if vmax is None else vmax
+    fraction = (values - vmin) / (vmax - vmin) if vmax > vmin else np.zeros_like(values)
+    return smin + np.clip(fraction, 0, 1) * (smax - smin)
+
+
+# Axes.scatter with the colors and sizes worked out through the tables above.
+# c can be colors (names, or an (n, 3) or (n, 4) array), category values (colored with palette), numbers (colored with
+# cmap) or a single color. Strings and bools are categories unless they are all color names, numbers (ints too) go
+# through the colormap, categorical=True or False overrides that.
+# s can be numbers or a single size. With colorbar=True a numeric c gets a colorbar, categories get a legend.
+def scatter(ax, x, y, c=None, s=None, cmap='viridis', vmin=None, vmax=None, palette=None, categorical=None,
+            size_range=None, colorbar=False, alpha=None, **scatter_kwargs):
+    colors, categories, numeric = None, None, False
+    if c is not None and np.ndim(c) > 0:
+        c = np.asarray(c)
+        if c.ndim == 2 and c.shape[1] in (3, 4) and c.dtype.kind == 'f':
+            # already RGB(A), one row per point
+            colors = ColorTable(c, alpha).table
+        elif categorical is None and c.dtype.kind in 'OUS':
+            colors = named_colors(c, alpha)
+        if colors is None:
+            if categorical is None:
+                categorical = c.dtype.kind in 'OUSb'
+            if categorical:
+                categories, colors = categorical_colors(c, palette, alpha)
+            else:
+                vmin = np.nanmin(c) if vmin is None else vmin
+                vmax = np.nanmax(c) if vmax is None else vmax
+                colors = map_colors(c, cmap, vmin, vmax, alpha=alpha)
+            numeric = not categorical
+    sizes = s
+    if s is not None and np.ndim(s) > 0:
+        sizes = map_sizes(s, *(size_range or (None, None)))
+    points = ax.scatter(x, y, c=c if colors is None else colors, s=sizes,
+                        alpha=alpha if colors is None else None, **scatter_kwargs)
+
+    if colorbar and categories is not None:
+        from matplotlib.lines import Line2D
+        table = palette_table(tuple(cycle_colors() if palette is None else palette), alpha)
+        handles = [Line2D([], [], linestyle='', marker='o', color=table[i % len(table)], label=str(category))
+                   for i, category in enumerate(categories)]
+        ax.legend(handles=handles)
+    elif colorbar and numeric:
+        import matplotlib as mpl
+        mappable = mpl.cm.ScalarMappable(mpl.colors.Normalize(vmin, vmax), cmap)
+        ax.figure.colorbar(mappable, ax=ax)
+    return points
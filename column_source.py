@@ -0,0 +1,161 @@
+# COLUMN SOURCES
+
+# coursera_week4.py reads IRIS.csv with pd.read_csv and builds whole DataFrames before plotting them. Parsing text is
+# slow, the whole file has to fit in memory even if a chart only uses two columns, and then each plotting call copies
+# the columns it uses into new float arrays.
+
+# A ColumnSource reads columns straight out of a file in a binary format, one at a time and only when a chart asks for
+# them. There are three kinds of file:
+
+#   a directory with one .npy file per column, opened memory-mapped, so a column is a view of the file and the
+#   operating system only reads the pages that are actually used;
+#   an Arrow IPC file (.arrow or .feather), also memory-mapped, where a numeric column without missing values is read
+#   as a numpy view of the file's buffer, no copy;
+#   a Parquet file, which is compressed, so a column has to be decoded, but only the requested columns are read.
+
+# The plotting functions below take a source and column names, like df.plot.scatter('A', 'C', c='B', s=df['B']) takes
+# a DataFrame, and give the artists the column arrays without making another copy. convert_csv turns a CSV file into a
+# directory of .npy columns once, so it never has to be parsed again.
+
+import os
+
+import numpy as np
+
+
+class ColumnSource:
+
+    def __init__(self, path):
+        self.path = path
+        self._cache = {}
+        if os.path.isdir(path):
+            self.kind = 'npy'
+            self.columns = sorted(name[:-4] for name in os.listdir(path) if name.endswith('.npy'))
+        elif path.endswith(('.arrow', '.feather', '.ipc')):
+            import pyarrow as pa
+            self.kind = 'arrow'
+            self._reader = pa.ipc.open_file(pa.memory_map(path, 'r'))
+            self.columns = list(self._reader.schema.names)
+        elif path.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            self.kind = 'parquet'
+            self._reader = pq.ParquetFile(path, memory_map=True)
+            self.columns = list(self._reader.schema_arrow.names)
+        else:
+            raise ValueError('unknown kind of column source: {}'.format(path))
+
+    def __len__(self):
+        return len(self[self.columns[0]]) if self.columns else 0
+
+    # one column as a numpy array, read the first time it's asked for
+    def __getitem__(self, name):
+        if name not in self._cache:
+            if name not in self.columns:
+                raise KeyError(name)
+            self._cache[name] = self._read(name)
+        return self._cache[name]
+
+    def _read(self, name):
+        if self.kind == 'npy':
+            return np.load(os.path.join(self.path, name + '.npy'), mmap_mode='r')
+        if self.kind == 'arrow':
+            import pyarrow as pa
+            # an IPC file can hold several record batches, a column that spans more than one has to be joined up
+            chunks = [self._reader.get_batch(i).column(name) for i in range(self._reader.num_record_batches)]
+            column = chunks[0] if len(chunks) == 1 else pa.concat_arrays(chunks)
+            return arrow_to_numpy(column)
+        table = self._reader.read(columns=[name])
+        return arrow_to_numpy(table.column(name).combine_chunks())
+
+    # several columns at once, as a dict of name -> array
+    def select(self, names):
+        return {name: self[name] for name in names}
+
+    # a DataFrame of just these columns, for the pandas plotting functions that need one.
+    # The columns are handed over without copying where pandas allows it.
+    def to_frame(self, names=None):
+        import pandas as pd
+        return pd.DataFrame(self.select(names or self.columns), copy=False)
+
+
+# numbers without missing values are a view of the arrow buffer, anything else has to be converted
+def arrow_to_numpy(array):
+    import pyarrow as pa
+    if array.null_count == 0 and (pa.types.is_integer(array.type) or pa.types.is_floating(array.type)):
+        return array.to_numpy(zero_copy_only=True)
+    return array.to_numpy(zero_copy_only=False)
+
+
+# read a CSV file in chunks and write each column to its own .npy file in directory. Text columns are stored as
+# fixed-width unicode arrays.
+# Only one chunk is in memory at a time: every chunk of every column is written to a piece file as soon as it's read,
+# and once the whole file is through (and the type and width of each column are known) the pieces are copied one after
+# another into a memory-mapped .npy file.
+def convert_csv(csv_path, directory, chunksize=1000000):
+    import shutil
+    import tempfile
+    import pandas as pd
+    os.makedirs(directory, exist_ok=True)
+    work = tempfile.mkdtemp(dir=directory)
+    try:
+        pieces = {}
+        for i, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunksize)):
+            for j, name in enumerate(chunk.columns):
+                values = chunk[name].to_numpy()
+                if values.dtype == object:
+                    values = values.astype(str)
+                path = os.path.join(work, '{}_{}.npy'.format(j, i))
+                np.save(path, values)
+                pieces.setdefault(name, []).append((path, values.dtype, len(values)))
+        for name, parts in pieces.items():
+            dtypes = [dtype for _, dtype, _ in parts]
+            if any(dtype.kind == 'U' for dtype in dtypes):
+                # a column that is text in some chunk is text all the way, as wide as its widest chunk
+                widths = [dtype.itemsize if dtype.kind == 'U' else np.load(path).astype(str).dtype.itemsize
+                          for path, dtype, _ in parts]
+                dtype = np.dtype('<U{}'.format(max(widths) // 4))
+            else:
+                dtype = np.result_type(*dtypes)
+            out = np.lib.format.open_memmap(os.path.join(directory, '{}.npy'.format(name)), mode='w+', dtype=dtype,
+                                            shape=(sum(n for _, _, n in parts),))
+            start = 0
+            for path, _, n in parts:
+                out[start:start + n] = np.load(path, mmap_mode='r').astype(dtype)
+                start += n
+                os.remove(path)
+            out.flush()
+            del out
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return ColumnSource(directory)
+
+
+# df.plot() for a source: every column in y against x (or against the row number)
+def line(ax, source, y=None, x=None, **plot_kwargs):
+    names = y or [c for c in source.columns if c != x and np.issubdtype(source[c].dtype, np.number)]
+    xs = source[x] if x is not None else np.arange(len(source))
+    lines = [ax.plot(xs, source[name], label=name, **plot_kwargs)[0] for name in names]
+    ax.legend()
+    return lines
+
+
+# df.plot.scatter(x, y, c=..., s=...) for a source, c and s can be column names
+def scatter(ax, source, x, y, c=None, s=None, colormap=None, **scatter_kwargs):
+    c_values = source[c] if isinstance(c, str) and c in source.columns else c
+    s_values = source[s] if isinstance(s, str) and s in source.columns else s
+    points = ax.scatter(source[x], source[y], c=c_values, s=s_values, cmap=colormap, **scatter_kwargs)
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    if isinstance(c, str) and c in source.columns:
+        ax.figure.colorbar(points, ax=ax, label=c)
+    return points
+
+
+# df.plot.hist() for a source, all the columns share the same bins like in pandas
+def hist(ax, source, columns=None, bins=10, **hist_kwargs):
+    names = columns or [c for c in source.columns if np.issubdtype(source[c].dtype, np.number)]
+    lo = min(np.nanmin(source[name]) for name in names)
+    hi = max(np.nanmax(source[name]) for name in names)
+    edges = np.linspace(lo, hi, bins + 1)
+    result = [ax.hist(source[name], bins=edges, label=name, **hist_kwargs) for name in names]
+    ax.legend()
+    return result
@@ -86,6 +86,14 @@ ax.get_children()
 # A number of spines which are actual renderings of the borders of the frame including tic markers, two axis objects,
 # and a bunch of text which are the labels for the chart. There's even a rectangle which is the background for the axes.
 
+# plot_series in series_collection.py takes all the series at once and draws their markers as a single collection, so
+# the same three points are one child of the axes instead of three Line2D objects.
+
+from series_collection import plot_series, fill_bands
+
+plt.figure()
+_ = plot_series(plt.gca(), [[1.5], [2], [2.5]], x=[[1.5], [2], [2.5]], linestyles='', marker='o', legend=False)
+
 # Scatterplots
 
 # A scatterplot is a two dimensional plot similar to the line plots I've shown. The scatter function takes an x-axis
@@ -114,6 +122,17 @@ plt.figure()
 # plot the point with size 100 and chosen colors
 plt.scatter(x, y, s=100, c=colors)
 
+# matplotlib turns every string in colors into RGBA on its own. With a ColorTable from color_mapping.py the two colors
+# are turned into RGBA once, and each point just picks one of them by its code, 0 for green and 1 for red.
+
+from color_mapping import ColorTable
+
+codes = np.zeros(len(x), dtype=int)
+codes[-1] = 1
+
+plt.figure()
+plt.scatter(x, y, s=100, c=ColorTable(['green', 'red'])[codes])
+
 # convert the two lists into a list of pairwise tuples
 zip_generator = zip([1,2,3,4,5], [6,7,8,9,10])
 
@@ -196,6 +215,13 @@ plt.gca().fill_between(range(len(linear_data))# length
                        ,alpha=0.25 # transparency
                       )
 
+# The same figure with plot_series, both series (and their markers) as one collection each, and the band from
+# fill_bands, which draws any number of bands as one collection too.
+
+plt.figure()
+_ = plot_series(plt.gca(), [linear_data, exponential_data], marker='o', labels=['Baseline', 'Competition'])
+_ = fill_bands(plt.gca(), range(len(linear_data)), linear_data, exponential_data, colors='blue', alpha=0.25)
+
 # working with dates
 
 plt.figure()
@@ -221,6 +247,16 @@ ax.set_title('Exponential vs. Linear performance')
 # you can add mathematical expressions in any text element
 ax.set_title("Exponential ($x^2$) vs. Linear ($x$) performance")
 
+# The loop above turns each tick label on its own, and only the labels that exist right now. plot_dates in date_axis.py
+# converts the dates to plot coordinates once, puts ticks and labels on the axis that are kept in a cache, and turns
+# the labels, now and after any zoom, with a single setting.
+
+from date_axis import plot_dates
+
+plt.figure()
+_ = plot_dates(plt.gca(), observation_dates, linear_data, exponential_data, fmt='-o', rotation=45)
+plt.subplots_adjust(bottom=0.25)
+
 # Bar Charts
 
 # Matplotlib has support for several kinds of bar charts. The most general case, we plot a bar chart by sending in a
@@ -262,4 +298,17 @@ plt.bar(xvals, exponential_data, width = 0.3, bottom=linear_data, color='r')
 plt.figure()
 xvals = range(len(linear_data))
 plt.barh(xvals, linear_data, height = 0.3, color='b')
-plt.barh(xvals, exponential_data, height = 0.3, left=linear_data, color='r')
\ No newline at end of file
+plt.barh(xvals, exponential_data, height = 0.3, left=linear_data, color='r')
+
+# Each plt.bar call above makes one Rectangle per bar. bar_chart in bar_builder.py takes all the series as the columns
+# of one array, works out the offsets and the stacking with numpy, and draws each series as a single collection.
+
+from bar_builder import bar_chart
+
+plt.figure()
+_ = bar_chart(plt.gca(), np.column_stack([linear_data, exponential_data]), labels=['Linear', 'Exponential'],
+              width=0.6, err=np.column_stack([linear_err, np.zeros(len(linear_data))]))
+
+plt.figure()
+_ = bar_chart(plt.gca(), np.column_stack([linear_data, exponential_data]), labels=['Linear', 'Exponential'],
+              stacked=True, horizontal=True, width=0.3, colors=['b', 'r'])
@@ -56,6 +56,20 @@ for n in range(0,len(axs)):
     axs[n].hist(sample, bins=100)
     axs[n].set_title('n={}'.format(sample_size))
 
+# SmallMultiples in small_multiples.py does the same with one binning pass for all four samples, and works out the
+# shared tick labels once instead of once per panel.
+
+from small_multiples import SmallMultiples
+
+# the comparisons added to this script all draw into this one figure, each clearing the one before, so they don't keep
+# more figures open than the tutorial itself does
+demo = plt.figure()
+grid = SmallMultiples(plt.gcf(), 2, 2, sharex=True, sharey=False)
+samples = [np.random.normal(loc=0.0, scale=1.0, size=10**(n+1)) for n in range(4)]
+_ = grid.hist(samples, bins=100)
+for ax, sample in zip(grid.axes.flat, samples):
+    ax.set_title('n={}'.format(len(sample)))
+
 # The GridSpec allows you to map axes over multiple cells in a grid.
 
 plt.figure()
@@ -102,6 +116,17 @@ for ax in [top_histogram, lower_right]:
 for ax in [side_histogram, lower_right]:
     ax.set_ylim(-5, 5)
 
+# With many more points than this, drawing every marker gets slow and an SVG of the figure gets huge. The
+# scatter_with_marginals function in density_scatter.py builds the same layout from one 2D histogram of X and Y, and above
+# max_points draws the lower right as a density image instead of one marker per point.
+
+from density_scatter import scatter_with_marginals
+
+plt.figure(demo.number)
+plt.clf()
+top_histogram, side_histogram, lower_right = scatter_with_marginals(plt.gcf(), X, Y, bins=100,
+                                                                    range=[(0, 1), (-5, 5)], max_points=1000)
+
 # Box and Whisker plots
 
 # A box plot. Sometimes called a box-and-whisker plot is a method of showing aggregate statistics of various samples
@@ -120,6 +145,17 @@ df = pd.DataFrame({'normal': normal_sample,
 
 df.describe()
 
+# describe needs all of df in memory. FrameStats in chunked_stats.py goes over the data once, a chunk at a time, and
+# keeps just enough per column to give the same table, the histograms and the box plots, so the data could just as well
+# be read in pieces from a file much bigger than memory with csv_chunks or parquet_chunks.
+
+from chunked_stats import FrameStats
+
+stats = FrameStats(df.columns, bins=100, range=(-5, 20))
+for start in range(0, len(df), 2500):
+    stats.add(df.iloc[start:start + 2500])
+stats.describe()
+
 # Like standard deviation, the interquartile range is a measure of variability of data. And it's common to plot this
 # using a box plot.
 
@@ -144,6 +180,18 @@ plt.clf()
 # plot boxplots for all three of df's columns
 _ = plt.boxplot([ df['normal'], df['random'], df['gamma'] ], whis=10000.0)
 
+# plt.clf() empties a figure, but every figure made with plt.figure() stays open until the script ends. A FigurePool
+# from figure_pool.py hands out figures for one chart at a time and reuses them, which is what a long running process
+# that draws many charts should do. stats() shows what the pool is holding on to.
+
+from figure_pool import FigurePool
+
+pool = FigurePool(max_figures=4)
+with pool.figure() as pooled:
+    pooled.add_subplot().boxplot([ df['normal'], df['random'], df['gamma'] ], whis=10000.0)
+    pooled.canvas.draw()
+pool.stats()
+
 # if we look at the gamma distribution, for instance, we see the tail of it is very, very long. So the maximum values
 # are very far out.
 
@@ -174,10 +222,35 @@ ax2.margins(x=0.5)
 # switch the y axis ticks for ax2 to the right side
 ax2.yaxis.tick_right()
 
+# ax2 bins df['gamma'] again and is drawn again every time the figure is. hist_inset in cached_inset.py draws the inset
+# from counts we already have, once, into an image that is reused until the counts or the size of the inset change.
+
+from cached_inset import hist_inset
+
+gamma_counts, gamma_edges = np.histogram(df['gamma'], bins=100)
+
+plt.figure(demo.number)
+plt.clf()
+plt.boxplot([ df['normal'], df['random'], df['gamma'] ], whis=10000.0)
+_ = hist_inset(plt.gca(), gamma_counts, gamma_edges, margins=0.5)
+
 # if `whis` argument isn't passed, boxplot defaults to showing 1.5*interquartile (IQR) whiskers with outliers
 plt.figure()
 _ = plt.boxplot([ df['normal'], df['random'], df['gamma'] ] )
 
+# Every boxplot call above works out the quartiles, whiskers and fliers of all three columns again. box_stats.py keeps
+# them in a cache and draws with Axes.bxp, so the second and third plots of the same columns don't touch the data.
+
+import box_stats
+
+plt.figure(demo.number)
+plt.clf()
+_ = box_stats.boxplot(plt.gca(), [ df['normal'], df['random'], df['gamma'] ], whis=10000.0)
+
+plt.figure(demo.number)
+plt.clf()
+_ = box_stats.boxplot(plt.gca(), [ df['normal'], df['random'], df['gamma'] ] )
+
 # Heatmaps
 
 # Heatmaps are a way to visualize three-dimensional data and to take advantage of spatial proximity of those dimensions.
@@ -194,6 +267,23 @@ _ = plt.hist2d(X, Y, bins=100)
 # add a colorbar legend
 plt.colorbar()
 
+# Both hist2d calls bin all of X and Y again. Heatmap2D in heatmap_accumulator.py keeps the 100x100 grid of counts
+# instead, which can be filled a chunk at a time, and the 25x25 heatmap is the same grid with the bins summed in fours.
+
+from heatmap_accumulator import Heatmap2D
+
+heatmap = Heatmap2D(xrange=(0, 1), yrange=(-5, 5), bins=100)
+for start in range(0, len(X), 1000):
+    heatmap.add(X[start:start+1000], Y[start:start+1000])
+
+plt.figure(demo.number)
+plt.clf()
+_ = heatmap.coarsen(4).draw(plt.gca())
+
+plt.figure(demo.number)
+plt.clf()
+_ = heatmap.draw(plt.gca(), colorbar=True)
+
 # Animation
 
 # The Maplotlib.animation module contains important helpers for building animations.
@@ -268,6 +358,25 @@ def update(curr):
 fig = plt.figure()
 a = animation.FuncAnimation(fig, update, interval=100)
 
+# update() above re-bins all of x[:curr] and rebuilds every artist on each frame. Since the bins are fixed, the
+# StreamingHistogram in streaming_hist.py only adds the new samples to the counts, changes the bar heights in place and
+# uses blitting, so the title and labels are set once and only the bars and the annotation get redrawn. Here it draws
+# the same animation in a second figure.
+
+from streaming_hist import StreamingHistogram
+
+streaming_fig = plt.figure()
+plt.gca().set_title('Sampling the Normal Distribution')
+plt.gca().set_ylabel('Frequency')
+plt.gca().set_xlabel('Value')
+hist = StreamingHistogram(plt.gca(), bins=np.arange(-4, 4, 0.5), ylim=(0, 30), label_xy=[3,27])
+streaming = hist.animate(streaming_fig, x, interval=100)
+
+# To save an animation like this to a file, animation_export.py draws every frame from scratch from its index alone,
+# so the frames can be drawn by several processes at once, and writes them to a gif, webp or (with ffmpeg) mp4 file.
+#
+#   python animation_export.py sampling.gif --frames 100 --workers 4
+
 # Interactivity
 
 plt.figure()
@@ -282,6 +391,21 @@ def onclick(event):
 # tell mpl_connect we want to pass a 'button_press_event' into onclick when the event is detected
 plt.gcf().canvas.mpl_connect('button_press_event', onclick)
 
+# onclick throws the whole plot away just to change the title. BlitRedraw in blit_redraw.py only redraws the title on
+# top of a saved copy of the rest of the figure, and draws at most once per frame however fast the clicks come in.
+
+from blit_redraw import BlitRedraw
+
+plt.figure()
+plt.plot(data)
+redraw = BlitRedraw(plt.gcf().canvas, [plt.gca().title])
+
+def onclick_blit(event):
+    redraw.artists[0].set_text('Event at pixels {},{} \nand data {},{}'.format(event.x, event.y, event.xdata, event.ydata))
+    redraw.request()
+
+plt.gcf().canvas.mpl_connect('button_press_event', onclick_blit)
+
 from random import shuffle
 origins = ['China', 'Brazil', 'India', 'USA', 'Canada', 'UK', 'Germany', 'Iraq', 'Chile', 'Mexico']
 
@@ -305,4 +429,25 @@ def onpick(event):
 # tell mpl_connect we want to pass a 'pick_event' into onpick when the event is detected
 plt.gcf().canvas.mpl_connect('pick_event', onpick)
 
+# With millions of points, picker=5 measures the distance from the click to every point on every click. PickIndex in
+# pick_index.py keeps the points in a grid of 5 pixel cells, so a click only looks at the points next to it, and keeps
+# 'origin' as an array so we don't go through iloc.
+
+from pick_index import PickIndex
+
+plt.figure()
+# no picker here, the index does the hit testing
+plt.scatter(df['height'], df['weight'])
+plt.gca().set_ylabel('Weight')
+plt.gca().set_xlabel('Height')
+
+index = PickIndex(plt.gca(), df['height'], df['weight'], radius=5, origin=df['origin'])
+
+def onpick_indexed(ind, event):
+    origin = index.lookup('origin', ind[0])
+    event.inaxes.set_title('Selected item came from {}'.format(origin))
+    event.canvas.draw_idle()
+
+index.connect(onpick_indexed)
+
 
@@ -35,6 +35,23 @@ df
 
 df.plot() # add a semi-colon to the end of the plotting call to suppress unwanted output
 
+# df.plot() hands every row to matplotlib. For very long series, plot_frame in downsample.py keeps only the min and max
+# of each pixel column of the axes, and picks them again from a precomputed pyramid whenever we zoom or pan.
+
+from downsample import plot_frame
+
+plt.figure()
+_ = plot_frame(plt.gca(), df)
+
+# plot_dates in date_axis.py converts the date index to plot coordinates in one step and labels the axis from a cache
+# of ticks and labels, instead of going through the pandas date converter.
+
+from date_axis import plot_dates
+
+plt.figure()
+_ = plot_dates(plt.gca(), df.index, df['A'], df['B'], df['C'])
+plt.legend(df.columns)
+
 # We can select which plot we want to use by passing it into the 'kind' parameter.
 
 df.plot('A','B', kind = 'scatter')
@@ -67,6 +84,15 @@ df.plot.scatter('A', 'C', c='B', s=df['B'], colormap='viridis')
 ax = df.plot.scatter('A', 'C', c='B', s=df['B'], colormap='viridis')
 ax.set_aspect('equal')
 
+# scatter in color_mapping.py colors the points by looking column B up in a table of viridis colors that is made once
+# and kept, instead of running every value through the colormap.
+
+import color_mapping
+
+plt.figure()
+_ = color_mapping.scatter(plt.gca(), df['A'], df['C'], c=df['B'], s=df['B'], cmap='viridis', colorbar=True)
+plt.gca().set_aspect('equal')
+
 df.plot.box();
 
 df.plot.hist(alpha=0.7);
@@ -74,10 +100,47 @@ df.plot.hist(alpha=0.7);
 # Kernel density estimation plots are useful for deriving a smooth continuous function from a given sample.
 df.plot.kde();
 
+# plot.kde adds up one Gaussian per sample at every point of the curve. plot_kde in fast_kde.py bins the samples onto a
+# grid and convolves them with the kernel using an FFT, which gives the same curves in a fraction of the time, and keeps
+# them cached so plotting the same columns again costs nothing.
+
+from fast_kde import plot_kde
+
+plt.figure()
+_ = plot_kde(plt.gca(), df, bw_method='scott', gridsize=1024)
+
 iris = pd.read_csv('IRIS.csv')
 iris.head()
 
+# read_csv parses the whole file as text every time. convert_csv in column_source.py does that once and writes each
+# column to its own .npy file, after which a ColumnSource memory-maps only the columns a chart actually asks for. Here
+# the files go into a temporary directory, in practice it would be one next to the CSV that is kept.
+
+import tempfile
+
+from column_source import convert_csv, scatter as source_scatter
+
+iris_columns = convert_csv('IRIS.csv', tempfile.mkdtemp(suffix='_IRIS_columns'))
+plt.figure()
+_ = source_scatter(plt.gca(), iris_columns, 'sepal_length', 'petal_length', c='petal_width', colormap='viridis')
+
 pd.plotting.scatter_matrix(iris);
 
+# scatter_matrix in fast_scatter_matrix.py looks at each column once, and above max_points rows draws each panel as an
+# image of how many points fall in each pixel, worked out from the per-column passes.
+
+from fast_scatter_matrix import scatter_matrix
+
+plt.figure()
+_ = scatter_matrix(plt.gcf(), iris, max_points=100000)
+
 plt.figure()
 pd.tools.plotting.parallel_coordinates(iris, 'species');
+
+# parallel_coordinates in fast_parallel_coordinates.py scales all the columns at once and draws each species as a single
+# LineCollection, and for very many rows draws bands of how many rows go between each pair of axes instead.
+
+from fast_parallel_coordinates import parallel_coordinates
+
+plt.figure()
+_ = parallel_coordinates(plt.gca(), iris, 'species')
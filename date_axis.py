@@ -0,0 +1,213 @@
+# DATE AXIS
+
+# coursera_week2.py plots against np.arange('2017-01-01', '2017-01-09', dtype='datetime64[D]') and then turns the tick
+# labels one at a time with item.set_rotation(45). coursera_week4.py's df.plot() goes through the pandas date converter
+# for its 365 day index. Every time the view changes, matplotlib's AutoDateLocator works out new ticks through
+# dateutil rrules and AutoDateFormatter formats every label with strftime on a datetime object, which is most of the
+# time of a redraw when zooming about a long series of seconds.
+
+# Here everything is done on numpy datetime64 values:
+
+#   to_plot_coords turns an array of datetime64 (or a DatetimeIndex) into matplotlib date numbers with one subtraction
+#   and one division, whatever the unit;
+#   DateTickCache picks a step (1 second up to some years) for a range, lays the ticks on multiples of it with
+#   np.arange, and formats all their labels together with numpy string functions. The ticks of a range and the label of
+#   every tick are kept, so panning and zooming back only formats ticks that haven't been seen yet;
+#   CachedDateLocator and CachedDateFormatter put it on an axis, and rotate_labels rotates and aligns all the labels
+#   with one tick_params call, which also covers ticks made later on.
+
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib import ticker
+
+MONTHS = np.array(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])
+
+# the steps ticks can be apart, as (numpy unit, count), from the smallest to the largest
+STEPS = ([('s', n) for n in (1, 2, 5, 10, 15, 30)] + [('m', n) for n in (1, 2, 5, 10, 15, 30)] +
+         [('h', n) for n in (1, 2, 3, 6, 12)] + [('D', n) for n in (1, 2, 7, 14)] +
+         [('M', n) for n in (1, 2, 3, 6)] + [('Y', n) for n in (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)])
+
+# the length of each unit in microseconds, months and years are the average ones, only used to pick a step
+UNIT_US = {'s': 1e6, 'm': 60e6, 'h': 3600e6, 'D': 86400e6, 'M': 86400e6 * 365.2425 / 12, 'Y': 86400e6 * 365.2425}
+
+
+def epoch():
+    import matplotlib.dates as mdates
+    return np.datetime64(mdates.get_epoch(), 'us')
+
+
+# datetime64 values (any unit), a DatetimeIndex or datetime Series to matplotlib date numbers, NaT becomes nan
+def to_plot_coords(values):
+    if hasattr(values, 'tz') and values.tz is not None:
+        values = values.tz_convert('UTC').tz_localize(None)
+    values = np.asarray(values)
+    if not np.issubdtype(values.dtype, np.datetime64):
+        values = values.astype('datetime64[us]')
+    unit = np.datetime_data(values.dtype)[0]
+    if unit in ('Y', 'M', 'W', 'generic'):
+        # a day can't be written in years or months, these go to microseconds first
+        values = values.astype('datetime64[us]')
+        unit = 'us'
+    return (values - epoch().astype(values.dtype)) / np.timedelta64(1, 'D').astype('timedelta64[{}]'.format(unit))
+
+
+# matplotlib date numbers back to datetime64[us]
+def from_plot_coords(values):
+    return epoch() + np.round(np.asarray(values, dtype=float) * UNIT_US['D']).astype('timedelta64[us]')
+
+
+def two_digits(values):
+    return np.char.zfill(values.astype(str), 2)
+
+
+# the labels of ticks that are all multiples of one step
+def format_ticks(ticks, unit):
+    if unit == 'Y':
+        return ticks.astype('datetime64[Y]').astype(str)
+    if unit == 'M':
+        months = ticks.astype('datetime64[M]').astype(np.int64)
+        return np.char.add(np.char.add(MONTHS[months % 12], ' '), (1970 + months // 12).astype(str))
+    if unit == 'D':
+        return ticks.astype('datetime64[D]').astype(str)
+    seconds = (ticks - ticks.astype('datetime64[D]')).astype('timedelta64[s]').astype(np.int64)
+    hh_mm = np.char.add(np.char.add(two_digits(seconds // 3600), ':'), two_digits(seconds // 60 % 60))
+    if unit == 'h':
+        # with hours the day changes between ticks, so the date goes in too
+        days = ticks.astype('datetime64[D]')
+        months = ticks.astype('datetime64[M]')
+        month_day = np.char.add(np.char.add(two_digits(months.astype(np.int64) % 12 + 1), '-'),
+                                two_digits((days - months.astype('datetime64[D]')).astype(np.int64) + 1))
+        return np.char.add(np.char.add(month_day, ' '), hh_mm)
+    if unit == 'm':
+        return hh_mm
+    return np.char.add(np.char.add(hh_mm, ':'), two_digits(seconds % 60))
+
+
+class DateTickCache:
+
+    def __init__(self, max_ranges=256, max_labels=100000):
+        self.max_ranges = max_ranges
+        self.max_labels = max_labels
+        self._ranges = OrderedDict()
+        self._labels = {}
+
+    # the step for about maxticks ticks between vmin and vmax (date numbers)
+    @staticmethod
+    def step(vmin, vmax, maxticks):
+        span = (vmax - vmin) * UNIT_US['D']
+        for unit, count in STEPS:
+            if span / (count * UNIT_US[unit]) <= maxticks:
+                return unit, count
+        return STEPS[-1]
+
+    # the tick positions between vmin and vmax, as date numbers, and the step they are on
+    def ticks(self, vmin, vmax, maxticks=8):
+        key = (vmin, vmax, maxticks)
+        if key in self._ranges:
+            self._ranges.move_to_end(key)
+            return self._ranges[key]
+        unit, count = self.step(vmin, vmax, maxticks)
+        # ticks are on whole multiples of the step counted in its own unit from 1970, so the same ticks come back for
+        # any range that covers them
+        lo, hi = from_plot_coords([vmin, vmax]).astype('datetime64[{}]'.format(unit)).astype(np.int64)
+        start = -(-lo // count) * count
+        ticks = np.arange(start, hi + 1, count).astype('datetime64[{}]'.format(unit)).astype('datetime64[us]')
+        locs = to_plot_coords(ticks)
+        locs = locs[(locs >= vmin) & (locs <= vmax)]
+        self._ranges[key] = (locs, (unit, count))
+        if len(self._ranges) > self.max_ranges:
+            self._ranges.popitem(last=False)
+        self._fill_labels(locs, unit)
+        return locs, (unit, count)
+
+    def _fill_labels(self, locs, unit):
+        missing = np.array([loc for loc in locs if (loc, unit) not in self._labels])
+        if len(missing) == 0:
+            return
+        if len(self._labels) + len(missing) > self.max_labels:
+            self._labels.clear()
+        labels = format_ticks(from_plot_coords(missing), unit)
+        self._labels.update(zip(((loc, unit) for loc in missing), labels.tolist()))
+
+    # the labels of locs, which were ticks on a step with this unit
+    def labels(self, locs, unit):
+        self._fill_labels(locs, unit)
+        return [self._labels[loc, unit] for loc in locs]
+
+
+# the one cache shared by every axis, so figures drawn over the same dates share their labels
+default_cache = DateTickCache()
+
+
+class CachedDateLocator(ticker.Locator):
+
+    def __init__(self, maxticks=8, cache=None):
+        self.maxticks = maxticks
+        self.cache = cache or default_cache
+        self.unit = 'D'
+
+    def __call__(self):
+        vmin, vmax = self.axis.get_view_interval()
+        return self.tick_values(vmin, vmax)
+
+    def tick_values(self, vmin, vmax):
+        vmin, vmax = sorted((float(vmin), float(vmax)))
+        if not np.isfinite(vmin) or not np.isfinite(vmax) or vmin == vmax:
+            return []
+        locs, (self.unit, _) = self.cache.ticks(vmin, vmax, self.maxticks)
+        return self.raise_if_exceeds(locs)
+
+    def nonsingular(self, vmin, vmax):
+        if not np.isfinite(vmin) or not np.isfinite(vmax):
+            return 0.0, 1.0
+        if vmin == vmax:
+            return vmin - 1, vmax + 1
+        return vmin, vmax
+
+
+class CachedDateFormatter(ticker.Formatter):
+
+    def __init__(self, locator):
+        self.locator = locator
+
+    # matplotlib hands all the ticks of an axis over at once, they are looked up in the cache together
+    def format_ticks(self, values):
+        return self.locator.cache.labels(list(values), self.locator.unit)
+
+    def __call__(self, x, pos=None):
+        return self.format_ticks([x])[0]
+
+    # the text in the status bar under the mouse
+    def format_data_short(self, value):
+        return np.datetime_as_string(from_plot_coords(value), unit='s').replace('T', ' ')
+
+
+# rotate (and align) every tick label of one axis, including labels of ticks that are made later
+def rotate_labels(ax, rotation=45, axis='x'):
+    try:
+        # 'xtick' lines the rotated labels up with their ticks (it's new in matplotlib 3.10)
+        ax.tick_params(axis=axis, labelrotation=rotation, labelrotation_mode='{}tick'.format(axis))
+    except ValueError:
+        ax.tick_params(axis=axis, labelrotation=rotation)
+
+
+# put the cached date ticks on an axis that is plotted in date numbers
+def date_axis(ax, axis='x', maxticks=8, rotation=None, cache=None):
+    locator = CachedDateLocator(maxticks, cache)
+    target = ax.xaxis if axis == 'x' else ax.yaxis
+    target.set_major_locator(locator)
+    target.set_major_formatter(CachedDateFormatter(locator))
+    if rotation is not None:
+        rotate_labels(ax, rotation, axis)
+    return locator
+
+
+# plot any number of ys against the same dates, the dates are converted once and the axis gets the cached date ticks
+def plot_dates(ax, dates, *ys, fmt='-', rotation=None, maxticks=8, **plot_kwargs):
+    x = to_plot_coords(dates)
+    lines = []
+    for y in ys:
+        lines.extend(ax.plot(x, np.asarray(y), fmt, **plot_kwargs))
+    date_axis(ax, 'x', maxticks, rotation)
+    return lines
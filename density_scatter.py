@@ -0,0 +1,56 @@
+# SCATTER WITH MARGINAL HISTOGRAMS
+
+# The GridSpec example in coursera_week3.py puts a scatter plot of X and Y in the lower right, and histograms of X and Y
+# along the top and the left side. Every point becomes a vertex in the scatter's PathCollection, and each histogram
+# bins the whole array again on its own.
+
+# scatter_with_marginals builds the same layout from a single 2D histogram of the data. The top histogram is just the
+# sum of the 2D counts over y, and the side histogram the sum over x, so the data is only binned once. Below max_points
+# the points are still drawn as a normal scatter. Above it, the 2D counts are drawn as one image, the same binning that
+# plt.hist2d does, so the cost of drawing and the size of an SVG no longer depend on the number of points.
+
+import numpy as np
+from matplotlib.colors import LogNorm
+
+
+# the (xmin, xmax) and (ymin, ymax) of the data, used when no range is given
+def data_range(X, Y):
+    return [(float(np.min(X)), float(np.max(X))), (float(np.min(Y)), float(np.max(Y)))]
+
+
+# fig is the figure to draw into. bins is the number of histogram bins along each axis, used both for the marginals
+# and for the density image. Returns the three axes as (top_histogram, side_histogram, lower_right).
+def scatter_with_marginals(fig, X, Y, bins=100, range=None, max_points=100000, cmap='viridis', log=True,
+                           gridspec=None, **scatter_kwargs):
+    X = np.asarray(X).ravel()
+    Y = np.asarray(Y).ravel()
+    if range is None:
+        range = data_range(X, Y)
+
+    # the one pass over the data, everything else is drawn from these counts
+    counts, xedges, yedges = np.histogram2d(X, Y, bins=bins, range=range)
+
+    gspec = gridspec if gridspec is not None else fig.add_gridspec(3, 3)
+    top_histogram = fig.add_subplot(gspec[0, 1:])
+    side_histogram = fig.add_subplot(gspec[1:, 0])
+    lower_right = fig.add_subplot(gspec[1:, 1:])
+
+    if len(X) <= max_points:
+        lower_right.scatter(X, Y, **scatter_kwargs)
+    else:
+        # empty cells are left transparent, like hist2d with cmin=1
+        density = np.ma.masked_equal(counts.T, 0)
+        norm = LogNorm(vmin=1, vmax=max(density.max(), 1)) if log else None
+        lower_right.imshow(density, origin='lower', aspect='auto', interpolation='nearest', cmap=cmap, norm=norm,
+                           extent=[xedges[0], xedges[-1], yedges[0], yedges[-1]])
+
+    # weights= lets hist draw counts we already have, with one bin per edge
+    top_histogram.hist(xedges[:-1], bins=xedges, weights=counts.sum(axis=1))
+    side_histogram.hist(yedges[:-1], bins=yedges, weights=counts.sum(axis=0), orientation='horizontal')
+    side_histogram.invert_xaxis()
+
+    for ax in [top_histogram, lower_right]:
+        ax.set_xlim(xedges[0], xedges[-1])
+    for ax in [side_histogram, lower_right]:
+        ax.set_ylim(yedges[0], yedges[-1])
+    return top_histogram, side_histogram, lower_right
@@ -0,0 +1,139 @@
+# DOWNSAMPLED LINE PLOTS
+
+# df.plot() in coursera_week4.py and the observation_dates plot in coursera_week2.py give every row of the data to a
+# Line2D. That is fine for 365 rows, but a line can't show more detail than the number of pixels across the axes, so for
+# a hundred million rows nearly all the work of drawing it is wasted.
+
+# Min/max downsampling splits the visible part of a series into one bucket per pixel column and keeps only the lowest
+# and highest point of each bucket. Those are the points that decide what the column of pixels looks like, so the line
+# looks the same, but has at most two points per pixel. LTTB (largest triangle three buckets) keeps one point per bucket
+# instead, the one that makes the biggest triangle with its neighbours, which looks smoother but isn't exact.
+
+# When zooming in we need more detail again. To avoid going back to all the rows every time, a pyramid of levels is kept,
+# each one a min/max downsampling of the one below it, and a redraw starts from the coarsest level that still has enough
+# points in view.
+
+import numpy as np
+
+
+# indices of the min and max of y in each of n_buckets equal-sized buckets, in order
+def minmax_indices(y, n_buckets):
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    size = n // n_buckets
+    # the leftover points at the end are one more bucket, handled on its own so the rest can be one reshape
+    # nan is skipped by making it the worst candidate, a bucket of only nan just keeps its first point
+    low = np.where(np.isnan(y), np.inf, y)
+    high = np.where(np.isnan(y), -np.inf, y)
+    cut = size * n_buckets
+    offsets = np.arange(n_buckets) * size
+    lo = np.argmin(low[:cut].reshape(n_buckets, size), axis=1) + offsets
+    hi = np.argmax(high[:cut].reshape(n_buckets, size), axis=1) + offsets
+    if cut < n:
+        lo = np.append(lo, np.argmin(low[cut:]) + cut)
+        hi = np.append(hi, np.argmax(high[cut:]) + cut)
+    # keep the first and last points so the line reaches the ends of the data
+    return np.unique(np.concatenate([[0], lo, hi, [n - 1]]))
+
+
+def minmax_downsample(x, y, n_buckets):
+    ind = minmax_indices(np.asarray(y), n_buckets)
+    return np.asarray(x)[ind], np.asarray(y)[ind]
+
+
+# largest triangle three buckets, returns n_out points including the first and last
+def lttb_downsample(x, y, n_out):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        # the next bucket is represented by its average point
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        cx = x[stop:next_stop].mean() if next_stop > stop else x[-1]
+        cy = y[stop:next_stop].mean() if next_stop > stop else y[-1]
+        area = np.abs((x[a] - cx) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (cy - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+# x as floats for the pyramid, datetimes become matplotlib date numbers in one vectorized conversion
+def as_float_x(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        import matplotlib.dates as mdates
+        return mdates.date2num(x), True
+    return x.astype(float), False
+
+
+class Pyramid:
+
+    # x has to be sorted. Each level is a min/max downsampling of the one below by factor, level 0 is the data itself.
+    def __init__(self, x, y, factor=8, min_points=4096):
+        self.levels = [(x, y)]
+        while len(self.levels[-1][0]) > min_points:
+            lx, ly = self.levels[-1]
+            n_buckets = max(len(lx) // factor, 1)
+            self.levels.append(minmax_downsample(lx, ly, n_buckets))
+
+    # the part of the coarsest level that still has at least 4 * pixels points between xmin and xmax
+    def visible(self, xmin, xmax, pixels):
+        for lx, ly in reversed(self.levels):
+            # one point either side of the view so the line runs off the edges instead of stopping short
+            start = max(np.searchsorted(lx, xmin, side='left') - 1, 0)
+            stop = min(np.searchsorted(lx, xmax, side='right') + 1, len(lx))
+            if stop - start >= 4 * pixels or lx is self.levels[0][0]:
+                return lx[start:stop], ly[start:stop]
+
+    # at most 2 * pixels points covering [xmin, xmax]
+    def view(self, xmin, xmax, pixels, method='minmax'):
+        x, y = self.visible(xmin, xmax, pixels)
+        if method == 'lttb':
+            return lttb_downsample(x, y, 2 * int(pixels))
+        return minmax_downsample(x, y, int(pixels))
+
+
+class DownsampledLine:
+
+    # plot y against x on ax, redrawing from the pyramid whenever the x limits change
+    def __init__(self, ax, x, y, method='minmax', **plot_kwargs):
+        self.ax = ax
+        self.method = method
+        x, self.dates = as_float_x(x)
+        y = np.asarray(y, dtype=float)
+        order = np.argsort(x, kind='stable') if np.any(np.diff(x) < 0) else slice(None)
+        self.x, self.y = x[order], y[order]
+        self.pyramid = Pyramid(self.x, self.y)
+        self.line, = ax.plot(self.x[:1], self.y[:1], **plot_kwargs)
+        if self.dates:
+            ax.xaxis_date()
+        ax.update_datalim(np.column_stack([[self.x[0], self.x[-1]], [np.nanmin(self.y), np.nanmax(self.y)]]))
+        ax.autoscale_view()
+        self.update()
+        self._cid = ax.callbacks.connect('xlim_changed', self.update)
+
+    def update(self, ax=None):
+        xmin, xmax = self.ax.get_xlim()
+        pixels = max(int(self.ax.bbox.width), 1)
+        self.line.set_data(*self.pyramid.view(xmin, xmax, pixels, self.method))
+
+    def remove(self):
+        self.ax.callbacks.disconnect(self._cid)
+        self.line.remove()
+
+
+# plot every column of a DataFrame against its index, the downsampled version of df.plot()
+def plot_frame(ax, df, method='minmax', legend=True, **plot_kwargs):
+    lines = [DownsampledLine(ax, df.index.values, df[column].values, method=method, label=str(column), **plot_kwargs)
+             for column in df.columns]
+    if legend:
+        ax.legend()
+    return lines
@@ -0,0 +1,112 @@
+# FAST PARALLEL COORDINATES
+
+# The last call in coursera_week4.py, parallel_coordinates(iris, 'species'), draws every row of the DataFrame as its own
+# Line2D. With hundreds of thousands of rows that's hundreds of thousands of artists, each drawn on its own.
+
+# Here all the columns are scaled to 0..1 together in one numpy operation, and all the rows of one class go into a single
+# LineCollection, so there is one artist per class however many rows there are. The classes get the same colors as in
+# pandas, in the order they first appear, from the color cycle or from colormap.
+
+# Above max_rows even one collection has too many segments to draw. Then, between each pair of neighbouring axes, the
+# rows of a class are counted in a grid of bins x bins (where they leave the left axis and where they reach the right
+# one), and each non-empty cell is drawn as one segment whose opacity shows how many rows it stands for. You can also
+# draw a random sample of the rows with sample=.
+
+import numpy as np
+import matplotlib as mpl
+from matplotlib.collections import LineCollection
+
+
+# scale every column to 0..1, constant columns end up in the middle
+def normalize(values):
+    lo = np.nanmin(values, axis=0)
+    span = np.nanmax(values, axis=0) - lo
+    scaled = (values - lo) / np.where(span == 0, 1, span)
+    scaled[:, span == 0] = 0.5
+    return scaled
+
+
+def class_colors(n, color=None, colormap=None):
+    if color is not None:
+        colors = [color] if isinstance(color, str) else list(color)
+    elif colormap is not None:
+        cmap = mpl.colormaps[colormap] if isinstance(colormap, str) else colormap
+        colors = list(cmap(np.linspace(0, 1, n)))
+    else:
+        colors = mpl.rcParams['axes.prop_cycle'].by_key()['color']
+    return [colors[i % len(colors)] for i in range(n)]
+
+
+# one segment per non-empty cell of a bins x bins grid between each pair of neighbouring axes, and the count of each.
+# Each column is binned between its entry in lo and in hi (0 and 1 for normalized values), the segments are in the same
+# units as the values.
+def density_segments(values, bins, lo=0.0, hi=1.0):
+    lo = np.broadcast_to(np.asarray(lo, dtype=float), values.shape[1:])
+    span = np.broadcast_to(np.asarray(hi, dtype=float), values.shape[1:]) - lo
+    span = np.where(span > 0, span, 1)
+    cells = np.clip(((values - lo) / span * bins).astype(np.int64), 0, bins - 1)
+    centres = lo + (np.arange(bins)[:, None] + 0.5) / bins * span
+    segments, counts = [], []
+    for i in range(values.shape[1] - 1):
+        grid = np.bincount(cells[:, i] * bins + cells[:, i + 1], minlength=bins * bins)
+        left, right = np.divmod(np.flatnonzero(grid), bins)
+        segments.append(np.stack([np.column_stack([np.full(len(left), i), centres[left, i]]),
+                                  np.column_stack([np.full(len(right), i + 1), centres[right, i + 1]])], axis=1))
+        counts.append(grid[grid > 0])
+    return np.concatenate(segments), np.concatenate(counts)
+
+
+def parallel_coordinates(ax, frame, class_column, cols=None, normalized=True, max_rows=50000, bins=64,
+                         sample=None, seed=None, color=None, colormap=None, axvlines=True, axvlines_kwds=None,
+                         legend=True, **kwargs):
+    if cols is None:
+        cols = [c for c in frame.columns if c != class_column]
+    values = frame[cols].to_numpy(dtype=float)
+    labels = frame[class_column].to_numpy()
+
+    if sample is not None and sample < len(values):
+        rows = np.sort(np.random.default_rng(seed).choice(len(values), size=sample, replace=False))
+        values, labels = values[rows], labels[rows]
+
+    # rows with missing values are left out, there's no line to draw for them
+    keep = ~np.isnan(values).any(axis=1)
+    values, labels = values[keep], labels[keep]
+    if normalized:
+        values = normalize(values)
+
+    # classes in order of first appearance, the way pandas numbers them
+    classes, first, codes = np.unique(labels, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    colors = class_colors(len(classes), color, colormap)
+    density = len(values) > max_rows
+    if density:
+        # the same grid for every class, over the range of each column
+        lo, hi = (0.0, 1.0) if normalized else (values.min(axis=0), values.max(axis=0))
+    x = np.arange(len(cols))
+
+    collections = []
+    for rank, k in enumerate(order):
+        rows = values[codes == k]
+        if density:
+            segments, counts = density_segments(rows, bins, lo, hi)
+            rgba = np.tile(mpl.colors.to_rgba(colors[rank]), (len(counts), 1))
+            rgba[:, 3] = 0.05 + 0.95 * np.log1p(counts) / np.log1p(counts.max())
+            collection = LineCollection(segments, colors=rgba, label=str(classes[k]), **kwargs)
+        else:
+            # one polyline per row, all in one collection
+            segments = np.stack([np.broadcast_to(x, rows.shape), rows], axis=2)
+            collection = LineCollection(segments, colors=[colors[rank]], label=str(classes[k]), **kwargs)
+        ax.add_collection(collection)
+        collections.append(collection)
+
+    if axvlines:
+        for i in x:
+            ax.axvline(i, **(axvlines_kwds or {'linewidth': 1, 'color': 'black'}))
+    ax.set_xticks(x)
+    ax.set_xticklabels(cols)
+    ax.set_xlim(x[0], x[-1])
+    ax.autoscale_view(scalex=False)
+    if legend:
+        ax.legend(loc='upper right')
+    ax.grid()
+    return collections
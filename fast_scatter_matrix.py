@@ -0,0 +1,106 @@
+# FAST SCATTER MATRIX
+
+# pd.plotting.scatter_matrix(iris) in coursera_week4.py draws k * k panels one after another. Each panel on the diagonal
+# works out its own histogram, each of the others works out the limits of both its columns again and puts every row in
+# as a marker. Panel (i, j) and panel (j, i) show the same pairs of values, but everything is done twice.
+
+# Here each column is looked at once. That one pass gives its limits, the histogram for the diagonal, and the pixel (tile
+# cell) every value falls in along that column's axis. With that, the picture of a pair of columns is one bincount of the
+# two cell indices, the count of points in each cell of the panel, and panel (j, i) is the transpose of panel (i, j).
+# Those tiles are worked out in a thread pool and drawn as images. Passing the columns to other processes would cost
+# more than a bincount, so threads are used instead.
+
+# Below max_points rows the off-diagonal panels are ordinary scatter plots, like pandas draws them.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from matplotlib.colors import LogNorm
+
+from array_helpers import bin_index
+
+
+class ColumnSummary:
+
+    # one pass over values: limits with range_padding like pandas, histogram counts and the tile cell of every value
+    def __init__(self, values, bins=10, tile=128, range_padding=0.05):
+        values = np.asarray(values, dtype=float)
+        finite = np.isfinite(values)
+        lo, hi = (values[finite].min(), values[finite].max()) if finite.any() else (0.0, 1.0)
+        if lo == hi:
+            lo, hi = lo - 0.5, hi + 0.5
+        pad = (hi - lo) * range_padding / 2
+        self.limits = (lo - pad, hi + pad)
+
+        self.edges = np.linspace(lo, hi, bins + 1)
+        hist_index = bin_index(values, self.edges)
+        self.counts = np.bincount(hist_index[(hist_index >= 0) & (hist_index < bins)], minlength=bins)
+
+        cells = bin_index(values, np.linspace(self.limits[0], self.limits[1], tile + 1))
+        # -1 marks missing values, so a pair of columns can skip the rows where either is missing
+        cells[(cells < 0) | (cells >= tile)] = -1
+        self.cells = cells.astype(np.int16 if tile < 2**15 else np.int32)
+
+
+# count of points per cell for the column pair (a on y, b on x), as an image of tile x tile
+def pair_tile(a, b, tile):
+    valid = (a.cells >= 0) & (b.cells >= 0)
+    flat = a.cells[valid].astype(np.int64) * tile + b.cells[valid]
+    return np.bincount(flat, minlength=tile * tile).reshape(tile, tile)
+
+
+def scatter_matrix(fig, df, alpha=0.5, bins=10, tile=128, max_points=100000, marker='.', cmap='Greys',
+                   workers=None, hist_kwds=None, **scatter_kwds):
+    df = df.select_dtypes('number')
+    names = list(df.columns)
+    n = len(names)
+    hist_kwds = hist_kwds or {}
+    scatter_kwds.setdefault('edgecolors', 'none')
+    density = len(df) > max_points
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        summaries = list(pool.map(lambda name: ColumnSummary(df[name].values, bins, tile), names))
+        tiles = {}
+        if density:
+            pairs = [(i, j) for i in range(n) for j in range(i + 1, n)]
+            for (i, j), image in zip(pairs, pool.map(lambda p: pair_tile(summaries[p[0]], summaries[p[1]], tile),
+                                                      pairs)):
+                tiles[i, j] = image
+                tiles[j, i] = image.T
+
+    axes = fig.subplots(n, n, squeeze=False)
+    # no gaps between subplots
+    fig.subplots_adjust(wspace=0, hspace=0)
+    for i, a in enumerate(names):
+        for j, b in enumerate(names):
+            ax = axes[i, j]
+            if i == j:
+                s = summaries[i]
+                # the counts are already there, weights= just lets hist draw them
+                ax.hist(s.edges[:-1], bins=s.edges, weights=s.counts, **hist_kwds)
+                ax.set_xlim(s.limits)
+            else:
+                if density:
+                    image = np.ma.masked_equal(tiles[i, j], 0)
+                    ax.imshow(image, origin='lower', aspect='auto', interpolation='nearest', cmap=cmap,
+                              norm=LogNorm(vmin=1, vmax=max(image.max(), 1)),
+                              extent=summaries[j].limits + summaries[i].limits)
+                else:
+                    common = df[a].notna().values & df[b].notna().values
+                    ax.scatter(df[b].values[common], df[a].values[common], marker=marker, alpha=alpha,
+                               **scatter_kwds)
+                ax.set_xlim(summaries[j].limits)
+                ax.set_ylim(summaries[i].limits)
+
+            ax.set_xlabel(b)
+            ax.set_ylabel(a)
+            if j != 0:
+                ax.yaxis.set_visible(False)
+            if i != n - 1:
+                ax.xaxis.set_visible(False)
+
+    for ax in axes[-1, :]:
+        ax.tick_params(axis='x', labelsize=8, labelrotation=90)
+    for ax in axes[:, 0]:
+        ax.tick_params(axis='y', labelsize=8)
+    return axes
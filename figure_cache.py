@@ -0,0 +1,177 @@
+# FIGURE CACHE
+
+# The Figure_*.png files are made by running whole scripts again, even when nothing about a figure has changed. The
+# DataFrame in coursera_week4.py comes from np.random.seed(123) and linear_data and exponential_data in
+# coursera_week2.py are fixed, so most of the time the new PNG is byte for byte the old one.
+
+# FigureCache stores rendered figures on disk under a hash of everything that goes into them: the code that draws the
+# figure, its input arrays and DataFrames, its parameters, all of matplotlib's rcParams (which is where a style like
+# plt.style.use('seaborn-colorblind') ends up), the backend, the output format and dpi. If that hash is already in the
+# cache the stored bytes are returned and nothing is drawn.
+
+# The cache has a size limit. Reading an entry marks it as used, and when the files add up to more than max_bytes the
+# least recently used ones are deleted first. Data the drawing code reads from files isn't seen by the hash on its own,
+# pass file_digests of those files as a parameter.
+
+import functools
+import hashlib
+import inspect
+import io
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+
+# feed value into the hash h, arrays and DataFrames by their bytes, containers item by item
+def update_hash(h, value):
+    if isinstance(value, np.ndarray):
+        h.update(b'ndarray')
+        h.update(str((value.dtype.str, value.shape)).encode())
+        if value.dtype == object:
+            h.update(repr(value.tolist()).encode())
+        else:
+            h.update(np.ascontiguousarray(value).data)
+    elif hasattr(value, 'to_numpy') and hasattr(value, 'index'):
+        # a pandas Series or DataFrame: its values, and the labels and types of its index and columns
+        import pandas as pd
+        h.update(type(value).__name__.encode())
+        if hasattr(value, 'columns'):
+            h.update(repr((list(value.columns), list(value.dtypes))).encode())
+        else:
+            h.update(repr((value.name, value.dtype)).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().data)
+    elif isinstance(value, dict):
+        h.update(b'dict')
+        for key in sorted(value, key=repr):
+            update_hash(h, key)
+            update_hash(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update(type(value).__name__.encode())
+        for item in value:
+            update_hash(h, item)
+    elif isinstance(value, functools.partial):
+        h.update(b'partial')
+        for part in (value.func, value.args, value.keywords):
+            update_hash(h, part)
+    elif inspect.isfunction(value) or inspect.ismethod(value):
+        # a function is identified by its name and its source, so editing the drawing code invalidates its entries
+        h.update('{}.{}'.format(value.__module__, value.__qualname__).encode())
+        try:
+            h.update(inspect.getsource(value).encode())
+        except (OSError, TypeError):
+            pass
+    elif callable(value) and not isinstance(value, type):
+        # any other callable (an instance with __call__, a builtin) has no source of its own, its state goes in
+        # instead, pickled if it can be and by its type and repr if not
+        h.update('{}.{}'.format(type(value).__module__, type(value).__qualname__).encode())
+        try:
+            h.update(pickle.dumps(value))
+        except Exception:
+            h.update(repr(value).encode())
+    else:
+        h.update(repr(value).encode())
+    h.update(b'|')
+
+
+# the contents of the files at paths, for keys of figures that read their data from files
+def file_digests(paths):
+    digests = {}
+    for path in paths:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(2**20), b''):
+                h.update(block)
+        digests[path] = h.hexdigest()
+    return digests
+
+
+# the current matplotlib settings that change how a figure looks
+def style_state():
+    import matplotlib as mpl
+    return {'rcParams': {key: repr(value) for key, value in mpl.rcParams.items()},
+            'backend': mpl.get_backend(), 'matplotlib': mpl.__version__}
+
+
+def figure_key(draw, inputs=(), params=None, fmt='png', dpi=100):
+    h = hashlib.sha256()
+    for part in (draw, list(inputs), params or {}, style_state(), fmt, dpi):
+        update_hash(h, part)
+    return h.hexdigest()
+
+
+class FigureCache:
+
+    def __init__(self, directory='.figure_cache', max_bytes=512 * 2**20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key, fmt):
+        return os.path.join(self.directory, '{}.{}'.format(key, fmt))
+
+    # the stored bytes, or None if the key isn't in the cache
+    def get(self, key, fmt):
+        path = self.path(key, fmt)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        # the modification time is the last use, that's what eviction goes by. Another process may have evicted the
+        # entry since it was read, the bytes are still good then.
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return data
+
+    def put(self, key, fmt, data):
+        # write to a temporary file and rename it, so a reader never sees half a file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, self.path(key, fmt))
+        self.evict()
+
+    # delete the least recently used entries until the cache fits in max_bytes
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def size(self):
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+
+    # the bytes of the figure drawn by draw(fig, *inputs, **params), from the cache if it's there.
+    # On a miss the figure is drawn into a new Figure with an Agg canvas, saved, stored and then thrown away.
+    def render(self, draw, *inputs, fmt='png', dpi=100, params=None, savefig_kwargs=None):
+        key = figure_key(draw, inputs, params, fmt, dpi)
+        data = self.get(key, fmt)
+        if data is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            fig = Figure(dpi=dpi)
+            FigureCanvasAgg(fig)
+            draw(fig, *inputs, **(params or {}))
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt, **(savefig_kwargs or {}))
+            data = buffer.getvalue()
+            self.put(key, fmt, data)
+        return data
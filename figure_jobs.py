@@ -0,0 +1,268 @@
+# FIGURE JOBS
+
+# coursera_week2.py, coursera_week3.py and coursera_week4.py build their figures one after another through pyplot's
+# global state, plt.figure(), plt.gca() and plt.clf(). That's fine for learning, but it means a figure can only be
+# built by running the whole script, and every figure stays alive until the script ends.
+
+# Here every figure-building section of the scripts is its own function. A job takes the Figure it should draw into and
+# a random Generator, and never touches pyplot's current figure or axes, so each job can run on its own, in any
+# order, in any process. The name of a job is '<script>_<section>', and that is also the name of the file it's saved to.
+
+# Making the data is wrapped in phase('data'), so when a job is profiled (see profiling.py) the time spent on the data
+# is told apart from the time spent on the artists.
+
+# The week4 jobs draw the same figures as coursera_week4.py: they are drawn in its seaborn colorblind style (under its
+# current name), and walk_frame makes the same DataFrame as np.random.seed(123) followed by randn, whatever the seed of
+# the job. The other jobs get their random numbers from job_rng, so their data isn't the data of the scripts.
+
+import contextlib
+
+import numpy as np
+import pandas as pd
+
+from profiling import phase
+
+JOBS = {}
+# the files each job reads its data from, so the figure cache can tell when they have changed
+JOB_INPUTS = {}
+# the matplotlib style each job is drawn in, None for the default one
+JOB_STYLES = {}
+
+
+# decorator that adds a function to the JOBS registry, inputs are the paths of the files it reads
+def job(name, inputs=(), style=None):
+    def register(func):
+        JOBS[name] = func
+        JOB_INPUTS[name] = list(inputs)
+        JOB_STYLES[name] = style
+        return func
+    return register
+
+
+# the style of a job as a context manager, building and saving the figure should both happen inside it
+def job_style(name):
+    import matplotlib.style
+    style = JOB_STYLES.get(name)
+    return matplotlib.style.context(style) if style else contextlib.nullcontext()
+
+
+# every job gets its own seed, derived from its name, so the output doesn't depend on which jobs ran before it
+def job_rng(name, seed=123):
+    return np.random.default_rng([seed] + [ord(c) for c in name])
+
+
+linear_data = np.array([1, 2, 3, 4, 5, 6, 7, 8])
+exponential_data = linear_data**2
+
+
+# coursera_week2.py
+
+@job('week2_points')
+def week2_points(fig, rng):
+    ax = fig.add_subplot()
+    ax.plot(1.5, 1.5, 'o')
+    ax.plot(2, 2, 'o')
+    ax.plot(2.5, 2.5, 'o')
+
+
+@job('week2_scatter')
+def week2_scatter(fig, rng):
+    ax = fig.add_subplot()
+    x = np.array([1, 2, 3, 4, 5, 6, 7, 8])
+    colors = ['green']*(len(x)-1) + ['red']
+    ax.scatter(x, x, s=100, c=colors)
+
+
+@job('week2_scatter_legend')
+def week2_scatter_legend(fig, rng):
+    ax = fig.add_subplot()
+    x, y = (1, 2, 3, 4, 5), (6, 7, 8, 9, 10)
+    ax.scatter(x[:2], y[:2], s=100, c='red', label='Tall students')
+    ax.scatter(x[2:], y[2:], s=100, c='blue', label='Short students')
+    ax.set_xlabel('The number of times the child kicked a ball')
+    ax.set_ylabel('The grade of the student')
+    ax.set_title('Relationship between ball kicking and grades')
+    ax.legend(loc=4, frameon=False, title='Legend')
+
+
+@job('week2_lines')
+def week2_lines(fig, rng):
+    ax = fig.add_subplot()
+    ax.plot(linear_data, '-o', exponential_data, '-o')
+    ax.plot([22, 44, 55], '--r')
+    ax.set_xlabel('Some data')
+    ax.set_ylabel('Some other data')
+    ax.set_title('A title')
+    ax.legend(['Baseline', 'Competition', 'Us'])
+    ax.fill_between(range(len(linear_data)), linear_data, exponential_data, facecolor='blue', alpha=0.25)
+
+
+@job('week2_dates')
+def week2_dates(fig, rng):
+    ax = fig.add_subplot()
+    observation_dates = np.arange('2017-01-01', '2017-01-09', dtype='datetime64[D]')
+    ax.plot(observation_dates, linear_data, '-o', observation_dates, exponential_data, '-o')
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.subplots_adjust(bottom=0.25)
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Units')
+    ax.set_title("Exponential ($x^2$) vs. Linear ($x$) performance")
+
+
+@job('week2_bars')
+def week2_bars(fig, rng):
+    ax = fig.add_subplot()
+    xvals = np.arange(len(linear_data))
+    ax.bar(xvals, linear_data, width=0.3)
+    ax.bar(xvals + 0.3, exponential_data, width=0.3, color='red')
+    linear_err = rng.integers(0, 16, size=len(linear_data))
+    ax.bar(xvals, linear_data, width=0.3, yerr=linear_err)
+
+
+@job('week2_stacked_bars')
+def week2_stacked_bars(fig, rng):
+    ax = fig.add_subplot()
+    xvals = range(len(linear_data))
+    ax.bar(xvals, linear_data, width=0.3, color='b')
+    ax.bar(xvals, exponential_data, width=0.3, bottom=linear_data, color='r')
+
+
+@job('week2_stacked_barh')
+def week2_stacked_barh(fig, rng):
+    ax = fig.add_subplot()
+    xvals = range(len(linear_data))
+    ax.barh(xvals, linear_data, height=0.3, color='b')
+    ax.barh(xvals, exponential_data, height=0.3, left=linear_data, color='r')
+
+
+# coursera_week3.py
+
+@job('week3_subplots')
+def week3_subplots(fig, rng):
+    axs = fig.subplots(3, 3, sharex=True, sharey=True)
+    axs[1, 1].plot(linear_data, '-')
+    for ax in axs.flat:
+        ax.tick_params(labelbottom=True, labelleft=True)
+
+
+@job('week3_histograms')
+def week3_histograms(fig, rng):
+    axs = fig.subplots(2, 2, sharex=True).flat
+    for n, ax in enumerate(axs):
+        sample_size = 10**(n+1)
+        with phase('data'):
+            sample = rng.normal(loc=0.0, scale=1.0, size=sample_size)
+        ax.hist(sample, bins=100)
+        ax.set_title('n={}'.format(sample_size))
+
+
+@job('week3_gridspec')
+def week3_gridspec(fig, rng):
+    gspec = fig.add_gridspec(3, 3)
+    top_histogram = fig.add_subplot(gspec[0, 1:])
+    side_histogram = fig.add_subplot(gspec[1:, 0])
+    lower_right = fig.add_subplot(gspec[1:, 1:])
+    with phase('data'):
+        Y = rng.normal(loc=0.0, scale=1.0, size=10000)
+        X = rng.random(size=10000)
+    lower_right.scatter(X, Y)
+    top_histogram.hist(X, bins=100)
+    side_histogram.hist(Y, bins=100, orientation='horizontal')
+    side_histogram.invert_xaxis()
+    for ax in [top_histogram, lower_right]:
+        ax.set_xlim(0, 1)
+    for ax in [side_histogram, lower_right]:
+        ax.set_ylim(-5, 5)
+
+
+def box_frame(rng):
+    with phase('data'):
+        return pd.DataFrame({'normal': rng.normal(loc=0.0, scale=1.0, size=10000),
+                             'random': rng.random(size=10000),
+                             'gamma': rng.gamma(2, size=10000)})
+
+
+@job('week3_boxplot')
+def week3_boxplot(fig, rng):
+    df = box_frame(rng)
+    fig.add_subplot().boxplot([df['normal'], df['random'], df['gamma']])
+
+
+@job('week3_boxplot_inset')
+def week3_boxplot_inset(fig, rng):
+    import mpl_toolkits.axes_grid1.inset_locator as mpl_il
+    df = box_frame(rng)
+    ax = fig.add_subplot()
+    ax.boxplot([df['normal'], df['random'], df['gamma']], whis=10000.0)
+    ax2 = mpl_il.inset_axes(ax, width='60%', height='40%', loc=2)
+    ax2.hist(df['gamma'], bins=100)
+    ax2.margins(x=0.5)
+    ax2.yaxis.tick_right()
+
+
+@job('week3_heatmap')
+def week3_heatmap(fig, rng):
+    ax = fig.add_subplot()
+    with phase('data'):
+        Y = rng.normal(loc=0.0, scale=1.0, size=10000)
+        X = rng.random(size=10000)
+    _, _, _, image = ax.hist2d(X, Y, bins=100)
+    fig.colorbar(image, ax=ax)
+
+
+# coursera_week4.py
+
+# the style coursera_week4.py uses, 'seaborn-colorblind' was renamed in matplotlib 3.6
+WEEK4_STYLE = 'seaborn-v0_8-colorblind'
+
+
+# the DataFrame of coursera_week4.py, the legacy generator seeded with 123 gives the same numbers as np.random.seed(123)
+def walk_frame():
+    with phase('data'):
+        legacy = np.random.RandomState(123)
+        return pd.DataFrame({'A': legacy.randn(365).cumsum(0),
+                             'B': legacy.randn(365).cumsum(0) + 20,
+                             'C': legacy.randn(365).cumsum(0) - 20},
+                            index=pd.date_range('1/1/2017', periods=365))
+
+
+@job('week4_line', style=WEEK4_STYLE)
+def week4_line(fig, rng):
+    walk_frame().plot(ax=fig.add_subplot())
+
+
+@job('week4_scatter', style=WEEK4_STYLE)
+def week4_scatter(fig, rng):
+    df = walk_frame()
+    ax = df.plot.scatter('A', 'C', c='B', s=df['B'], colormap='viridis', ax=fig.add_subplot())
+    ax.set_aspect('equal')
+
+
+@job('week4_box', style=WEEK4_STYLE)
+def week4_box(fig, rng):
+    walk_frame().plot.box(ax=fig.add_subplot())
+
+
+@job('week4_hist', style=WEEK4_STYLE)
+def week4_hist(fig, rng):
+    walk_frame().plot.hist(alpha=0.7, ax=fig.add_subplot())
+
+
+@job('week4_kde', style=WEEK4_STYLE)
+def week4_kde(fig, rng):
+    walk_frame().plot.kde(ax=fig.add_subplot())
+
+
+@job('week4_scatter_matrix', inputs=['IRIS.csv'], style=WEEK4_STYLE)
+def week4_scatter_matrix(fig, rng):
+    with phase('data'):
+        iris = pd.read_csv('IRIS.csv')
+    axs = fig.subplots(iris.shape[1] - 1, iris.shape[1] - 1)
+    pd.plotting.scatter_matrix(iris, ax=axs)
+
+
+@job('week4_parallel_coordinates', inputs=['IRIS.csv'], style=WEEK4_STYLE)
+def week4_parallel_coordinates(fig, rng):
+    with phase('data'):
+        iris = pd.read_csv('IRIS.csv')
+    pd.plotting.parallel_coordinates(iris, 'species', ax=fig.add_subplot())
@@ -0,0 +1,171 @@
+# FIGURE POOL
+
+# The scripts call plt.figure() dozens of times and never close a figure, so pyplot keeps every Figure, with all its
+# artists and the arrays they hold, until the process ends. In a script that's only a waste, in a process that keeps
+# rendering charts (a web service, a notebook kernel) memory grows with every chart until the process is killed.
+
+# FigurePool hands out Figures with an Agg canvas for one render at a time and takes them back afterwards. A returned
+# figure is cleared, which lets go of its artists and data, and its layout engine, subplot parameters and colors are
+# put back to what a new Figure has (see reset_figure), but the Figure, its canvas and the canvas' pixel buffer are
+# kept and reused for the next render of the same size, so they don't have to be made again.
+
+# The pool has two limits, the number of figures it keeps (in use or idle) and the number of bytes they hold, estimated
+# from the pixel buffers and the vertices and images of the artists. When either is over, idle figures are dropped,
+# least recently used first. Figures in use are never dropped, and asking for one more than max_figures in use at once
+# is an error, which catches code that forgets to give figures back.
+
+#   pool = FigurePool(max_figures=4, max_bytes=64 * 2**20)
+#   with pool.figure(figsize=(6, 4)) as fig:
+#       fig.add_subplot().plot(data)
+#       fig.savefig(out)
+#   pool.stats()
+
+# trim_pyplot does the same kind of job for scripts that go through pyplot, it closes all but the newest figures.
+
+import contextlib
+import itertools
+
+from profiling import artist_stats
+
+
+class FigurePool:
+
+    def __init__(self, max_figures=8, max_bytes=256 * 2**20, figsize=None, dpi=100):
+        self.max_figures = max_figures
+        self.max_bytes = max_bytes
+        self.figsize = figsize
+        self.dpi = dpi
+        self._idle = []
+        self._live = {}
+        self._clock = itertools.count()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    # a cleared figure of this size, an idle one of the same size if there is one
+    def acquire(self, figsize=None, dpi=None):
+        import matplotlib as mpl
+        figsize = tuple(figsize or self.figsize or mpl.rcParams['figure.figsize'])
+        dpi = dpi or self.dpi
+        if len(self._live) >= self.max_figures:
+            raise RuntimeError('{} figures are already in use, release some first'.format(len(self._live)))
+
+        for i, (_, fig) in enumerate(self._idle):
+            if tuple(fig.get_size_inches()) == figsize and fig.dpi == dpi:
+                del self._idle[i]
+                self.reused += 1
+                break
+        else:
+            # no idle figure of this size, make room for a new one
+            self._evict(len(self._live) + len(self._idle) + 1 - self.max_figures)
+            fig = self._new_figure(figsize, dpi)
+        self._live[id(fig)] = fig
+        return fig
+
+    def _new_figure(self, figsize, dpi):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(fig)
+        self.created += 1
+        return fig
+
+    # take a figure back, its artists are dropped straight away and the figure waits for the next acquire
+    def release(self, fig):
+        if self._live.pop(id(fig), None) is None:
+            raise ValueError('this figure does not belong to the pool, or was already released')
+        reset_figure(fig)
+        self._idle.append((next(self._clock), fig))
+        self._evict(len(self._live) + len(self._idle) - self.max_figures)
+
+        # the size of every figure is worked out once, then idle ones are dropped until the rest fit
+        sizes = {id(fig): self.figure_bytes(fig) for fig in self.figures()}
+        total = sum(sizes.values())
+        self._idle.sort(key=lambda item: item[0])
+        count = 0
+        while count < len(self._idle) and total > self.max_bytes:
+            total -= sizes[id(self._idle[count][1])]
+            count += 1
+        self._evict(count)
+
+    @contextlib.contextmanager
+    def figure(self, figsize=None, dpi=None):
+        fig = self.acquire(figsize, dpi)
+        try:
+            yield fig
+        finally:
+            self.release(fig)
+
+    # drop count idle figures, the least recently used first
+    def _evict(self, count):
+        if count <= 0:
+            return
+        self._idle.sort(key=lambda item: item[0])
+        dropped, self._idle = self._idle[:count], self._idle[count:]
+        for _, fig in dropped:
+            # break the figure <-> canvas reference cycle so the pixel buffer goes without waiting for the gc
+            fig.canvas.__dict__.pop('renderer', None)
+            fig.clear()
+        self.evicted += len(dropped)
+
+    # drop every idle figure
+    def clear(self):
+        self._evict(len(self._idle))
+
+    # bytes held by one figure: its pixel buffer, and 16 bytes per vertex and 8 per image pixel of its artists
+    @staticmethod
+    def figure_bytes(fig, stats=None):
+        stats = stats or artist_stats(fig)
+        renderer = getattr(fig.canvas, 'renderer', None)
+        buffer = int(renderer.width * renderer.height * 4) if renderer is not None else 0
+        return buffer + 16 * stats['vertices'] + 8 * stats['image_pixels']
+
+    def retained_bytes(self):
+        return sum(self.figure_bytes(fig) for fig in self.figures())
+
+    def figures(self):
+        return list(self._live.values()) + [fig for _, fig in self._idle]
+
+    # counters for monitoring: figures in use and idle, how many were made, reused and dropped, and the artists and
+    # bytes the pool holds right now
+    def stats(self):
+        artists = 0
+        retained = 0
+        buffers = 0
+        for fig in self.figures():
+            stats = artist_stats(fig)
+            artists += stats['artists']
+            retained += self.figure_bytes(fig, stats)
+            renderer = getattr(fig.canvas, 'renderer', None)
+            buffers += int(renderer.width * renderer.height * 4) if renderer is not None else 0
+        return {'live': len(self._live), 'idle': len(self._idle), 'created': self.created, 'reused': self.reused,
+                'evicted': self.evicted, 'artists': artists, 'buffer_bytes': buffers, 'retained_bytes': retained}
+
+
+# empty fig and put back everything about the figure itself that a render can change, so a reused figure draws the
+# same as a new one
+def reset_figure(fig):
+    import matplotlib as mpl
+    from matplotlib.figure import SubplotParams
+    fig.clear()
+    # clear leaves the figure's own settings alone, the next user should get the defaults a new Figure starts with
+    fig.set_layout_engine(None)
+    fig.subplotpars = SubplotParams()
+    fig.set_facecolor(mpl.rcParams['figure.facecolor'])
+    fig.set_edgecolor(mpl.rcParams['figure.edgecolor'])
+    fig.set_linewidth(0.0)
+    fig.set_frameon(mpl.rcParams['figure.frameon'])
+    fig.patch.set_alpha(None)
+    fig.set_alpha(None)
+    fig.set_agg_filter(None)
+    fig.set_rasterized(False)
+
+
+# close pyplot figures until only the newest keep are left, returns how many were closed
+def trim_pyplot(keep=1):
+    import matplotlib.pyplot as plt
+    numbers = sorted(plt.get_fignums())
+    old = numbers[:max(len(numbers) - keep, 0)]
+    for number in old:
+        plt.close(number)
+    return len(old)
@@ -0,0 +1,119 @@
+# STREAMING HEATMAP ACCUMULATOR
+
+# The Heatmaps section of coursera_week3.py calls plt.hist2d(X, Y, bins=25) and then plt.hist2d(X, Y, bins=100), which
+# bins all of X and Y from scratch each time and needs both arrays in memory.
+
+# A 2D histogram with fixed bin edges is just an array of counts, so it can be built up a chunk at a time. Heatmap2D
+# keeps that array. Chunks can come from any iterator, for instance a generator, or the memory-mapped .npy and parquet
+# readers below, so the raw points never all have to be in memory. Grids that were filled in different processes can be
+# added together with merge, and the heatmap and its colorbar are drawn from the counts alone.
+
+# A coarser grid doesn't need the data either. If the 100 bins along an axis are grouped in fours, the sum of each
+# group is exactly the count of one of 25 bins with the same range, so coarsen(4) turns the 100-bin grid into the
+# 25-bin one.
+
+import numpy as np
+
+from array_helpers import bin_index
+
+
+class Heatmap2D:
+
+    # xrange and yrange are the (min, max) of each axis, bins the number of bins along each axis (an int, or a pair)
+    def __init__(self, xrange, yrange, bins=100):
+        xbins, ybins = (bins, bins) if np.isscalar(bins) else bins
+        self.xedges = np.linspace(xrange[0], xrange[1], xbins + 1)
+        self.yedges = np.linspace(yrange[0], yrange[1], ybins + 1)
+        self.counts = np.zeros((xbins, ybins), dtype=np.int64)
+        self.n = 0
+
+    # add one chunk of points, points outside the range are dropped just like np.histogram2d does
+    def add(self, X, Y):
+        X = np.asarray(X, dtype=float).ravel()
+        Y = np.asarray(Y, dtype=float).ravel()
+        xbins, ybins = self.counts.shape
+        # the edges are evenly spaced, so the bin of each point is plain arithmetic, no search needed
+        ix = bin_index(X, self.xedges)
+        iy = bin_index(Y, self.yedges)
+        inside = (ix >= 0) & (ix < xbins) & (iy >= 0) & (iy < ybins)
+        flat = np.bincount(ix[inside] * ybins + iy[inside], minlength=xbins * ybins)
+        self.counts += flat.reshape(xbins, ybins)
+        self.n += int(inside.sum())
+        return self
+
+    # add every (X, Y) chunk coming out of an iterator
+    def add_chunks(self, chunks):
+        for X, Y in chunks:
+            self.add(X, Y)
+        return self
+
+    # add the counts of another grid with the same edges, for instance one filled by a worker process
+    def merge(self, other):
+        if not (np.array_equal(self.xedges, other.xedges) and np.array_equal(self.yedges, other.yedges)):
+            raise ValueError('can only merge heatmaps with the same bin edges')
+        self.counts += other.counts
+        self.n += other.n
+        return self
+
+    # a new grid with factor (or (xfactor, yfactor)) neighbouring bins summed into one
+    def coarsen(self, factor):
+        fx, fy = (factor, factor) if np.isscalar(factor) else factor
+        xbins, ybins = self.counts.shape
+        if xbins % fx or ybins % fy:
+            raise ValueError('{}x{} bins cannot be grouped by {}x{}'.format(xbins, ybins, fx, fy))
+        coarse = Heatmap2D.__new__(Heatmap2D)
+        coarse.xedges = self.xedges[::fx]
+        coarse.yedges = self.yedges[::fy]
+        coarse.counts = self.counts.reshape(xbins // fx, fx, ybins // fy, fy).sum(axis=(1, 3))
+        coarse.n = self.n
+        return coarse
+
+    # draw the counts on ax the way hist2d does, returns the QuadMesh so it can be passed to colorbar
+    def draw(self, ax, colorbar=False, **pcolormesh_kwargs):
+        mesh = ax.pcolormesh(self.xedges, self.yedges, self.counts.T, **pcolormesh_kwargs)
+        ax.set_xlim(self.xedges[0], self.xedges[-1])
+        ax.set_ylim(self.yedges[0], self.yedges[-1])
+        if colorbar:
+            ax.figure.colorbar(mesh, ax=ax)
+        return mesh
+
+    # after more chunks have been added, update an already drawn mesh (and its colorbar) instead of drawing it again
+    def redraw(self, mesh):
+        mesh.set_array(self.counts.T.ravel())
+        mesh.autoscale()
+        return mesh
+
+
+# fill grids from several chunk iterators in a process pool and merge them.
+# make_chunks(i) has to return the i-th iterator, it is called inside the worker so the data is read there.
+def accumulate_parallel(make_chunks, parts, xrange, yrange, bins=100, workers=None):
+    from concurrent.futures import ProcessPoolExecutor
+    total = Heatmap2D(xrange, yrange, bins)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(accumulate_part, make_chunks, i, xrange, yrange, bins) for i in range(parts)]
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+
+def accumulate_part(make_chunks, i, xrange, yrange, bins):
+    return Heatmap2D(xrange, yrange, bins).add_chunks(make_chunks(i))
+
+
+# chunks of (X, Y) from two .npy files, the files are memory-mapped so only one chunk is read in at a time.
+# start and stop pick out a slice of the rows, which is how the work is split between processes.
+def npy_chunks(x_path, y_path, chunk_size=1000000, start=0, stop=None):
+    X = np.load(x_path, mmap_mode='r')
+    Y = np.load(y_path, mmap_mode='r')
+    stop = len(X) if stop is None else min(stop, len(X))
+    for i in range(start, stop, chunk_size):
+        j = min(i + chunk_size, stop)
+        yield np.asarray(X[i:j]), np.asarray(Y[i:j])
+
+
+# chunks of (X, Y) from two columns of a parquet file, one record batch at a time (this needs pyarrow)
+def parquet_chunks(path, x_column, y_column, chunk_size=1000000):
+    import pyarrow.parquet as pq
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=[x_column, y_column]):
+        yield (batch.column(x_column).to_numpy(zero_copy_only=False),
+               batch.column(y_column).to_numpy(zero_copy_only=False))
@@ -0,0 +1,92 @@
+# SPATIAL INDEX FOR PICKING
+
+# In the Interactivity section of coursera_week3.py the scatter is made with picker=5, and onpick looks the clicked
+# point up with df.iloc[event.ind[0]]['origin']. To find out which points are within 5 pixels of a click, matplotlib
+# transforms every point to pixels and measures its distance to the mouse, on every click. Then iloc builds a whole row
+# of the DataFrame just to read one value out of it.
+
+# PickIndex puts the points, in pixels, into a grid of cells as wide as the pick radius. A click can then only hit
+# points in its own cell and the eight cells around it, so only those get measured. The grid is kept until the axes
+# limits or the size of the axes on screen change, which is the only time the pixel positions of the points move.
+# Extra columns, like 'origin', are kept as plain arrays, so looking up a picked point is just indexing.
+
+import numpy as np
+
+
+class PickIndex:
+
+    # ax is the axes the points are drawn on, x and y their data coordinates and radius the pick distance in pixels.
+    # Any keyword arguments are kept as columns of metadata, one value per point, e.g. origin=df['origin'].
+    def __init__(self, ax, x, y, radius=5, **columns):
+        self.ax = ax
+        self.xy = np.column_stack([np.asarray(x, dtype=float), np.asarray(y, dtype=float)])
+        self.radius = float(radius)
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+        self._state = None
+        self._cid = None
+
+    # the view limits and the position of the axes in pixels, if either changes the grid has to be rebuilt
+    def _view_state(self):
+        return tuple(self.ax.viewLim.bounds) + tuple(self.ax.bbox.bounds)
+
+    def _build(self):
+        pixels = self.ax.transData.transform(self.xy)
+        cells = np.floor(pixels / self.radius)
+        # points that aren't finite (or are absurdly far off screen) can never be picked
+        usable = (np.isfinite(cells) & (np.abs(cells) < 2**30)).all(axis=1)
+        self._ids = np.flatnonzero(usable)
+        self._pixels = pixels[self._ids]
+        cells = cells[self._ids].astype(np.int64)
+
+        # one integer key per cell, then the points are sorted by key so each cell is a contiguous slice
+        self._origin = cells.min(axis=0) - 1 if len(cells) else np.zeros(2, dtype=np.int64)
+        cells -= self._origin
+        self._ny = int(cells[:, 1].max()) + 2 if len(cells) else 1
+        keys = cells[:, 0] * self._ny + cells[:, 1]
+        order = np.argsort(keys, kind='stable')
+        self._keys = keys[order]
+        self._ids = self._ids[order]
+        self._pixels = self._pixels[order]
+        self._state = self._view_state()
+
+    # indices of the points within the radius of the pixel position (px, py), nearest first
+    def query(self, px, py):
+        if self._state != self._view_state():
+            self._build()
+        cx, cy = (np.floor(np.array([px, py]) / self.radius).astype(np.int64) - self._origin)
+        if not 0 <= cy < self._ny:
+            return np.empty(0, dtype=np.int64)
+        candidates = []
+        for i in (cx - 1, cx, cx + 1):
+            for j in (cy - 1, cy, cy + 1):
+                key = i * self._ny + j
+                start, stop = np.searchsorted(self._keys, [key, key + 1])
+                candidates.append(np.arange(start, stop))
+        candidates = np.concatenate(candidates)
+        dist = np.hypot(*(self._pixels[candidates] - [px, py]).T)
+        near = dist <= self.radius
+        candidates, dist = candidates[near], dist[near]
+        return self._ids[candidates[np.argsort(dist, kind='stable')]]
+
+    # the value of a metadata column for the picked points
+    def lookup(self, column, ind):
+        return self.columns[column][ind]
+
+    # call callback(ind, event) whenever a click in the axes is within the radius of some points,
+    # ind is an array of the point indices, nearest first, like event.ind in a pick_event
+    def connect(self, callback):
+        def on_press(event):
+            if event.inaxes is not self.ax:
+                return
+            ind = self.query(event.x, event.y)
+            if len(ind):
+                callback(ind, event)
+
+        self.disconnect()
+        self._cid = self.ax.figure.canvas.mpl_connect('button_press_event', on_press)
+        return self._cid
+
+    def disconnect(self):
+        if self._cid is not None:
+            self.ax.figure.canvas.mpl_disconnect(self._cid)
+            self._cid = None
@@ -0,0 +1,203 @@
+# PROFILING FIGURES
+
+# None of the scripts measure anything, so when a figure gets slow there's no telling whether the time goes into making
+# the data (np.random, cumsum, df.describe()), into making the artists (plt.scatter, plt.hist) or into drawing them
+# (canvas.draw()).
+
+# FigureProfiler keeps one record per figure. Inside a record the code is split into named phases with the phase()
+# context manager, and for each phase we keep the wall time and, through tracemalloc, how much memory it allocated (net
+# and at its peak). Phases can be nested, 'data' inside 'build' for instance. Once the figure is done, the record also
+# counts the artists in the figure and in each axes, and how many vertices they hold, since that's what drawing costs.
+# When the figure is drawn through the record, every axes is drawn in its own phase, so the draw time and allocations
+# are there per axes as well.
+
+# The records can be written out as JSON, or as a Chrome trace (chrome://tracing, Perfetto or speedscope), which shows
+# the phases of each figure as a flame graph.
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+# the records being filled in right now, innermost last, so phase() can find the current one
+_active = []
+
+
+# a phase of the current figure record, or nothing if no figure is being profiled.
+# Code that builds figures can always call this, it only costs something while profiling.
+def phase(name):
+    return _active[-1].phase(name) if _active else nullcontext()
+
+
+def axes_label(ax, i):
+    return ax.get_label() or 'axes {}'.format(i)
+
+
+class FigureRecord:
+
+    def __init__(self, name):
+        self.name = name
+        self.phases = []
+        self.figure_stats = None
+        self.axes_stats = []
+        self._peaks = []
+        self._axes_draws = {}
+        self._depth = 0
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            # the parent phase keeps the highest peak seen so far, because resetting the peak here would lose it
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            tracemalloc.reset_peak()
+            self._peaks.append(current)
+        entry = {'name': name, 'depth': self._depth, 'start': time.perf_counter() - self._origin}
+        self.phases.append(entry)
+        self._depth += 1
+        try:
+            yield entry
+        finally:
+            self._depth -= 1
+            entry['wall_time'] = time.perf_counter() - self._origin - entry['start']
+            if tracing:
+                end, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, self._peaks.pop())
+                entry['allocated'] = end - current
+                entry['peak_allocated'] = peak - current
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+
+    # draw the figure, as its own phase. A Figure made without pyplot has no real canvas yet, so it gets an Agg one.
+    # Each axes is drawn in a phase of its own inside 'draw', so the draw time and allocations are known per axes too.
+    def draw(self, fig):
+        if not hasattr(fig.canvas, 'get_renderer'):
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            FigureCanvasAgg(fig)
+        self._axes_draws = {}
+        for i, ax in enumerate(fig.axes):
+            # an attribute on the instance comes before the class' draw, and is deleted again afterwards
+            ax.draw = self._timed_draw(ax, axes_label(ax, i))
+        try:
+            with self.phase('draw'):
+                fig.canvas.draw()
+        finally:
+            for ax in fig.axes:
+                ax.__dict__.pop('draw', None)
+
+    def _timed_draw(self, ax, label):
+        draw = type(ax).draw.__get__(ax)
+
+        def timed(renderer, *args, **kwargs):
+            with self.phase('draw ' + label) as entry:
+                self._axes_draws[id(ax)] = entry
+                return draw(renderer, *args, **kwargs)
+        return timed
+
+    # count the artists and vertices of the finished figure, in total and per axes, with the draw time and allocations
+    # of each axes if the figure was drawn through draw
+    def collect(self, fig):
+        self.figure_stats = artist_stats(fig)
+        self.axes_stats = []
+        for i, ax in enumerate(fig.axes):
+            stats = dict(artist_stats(ax), label=axes_label(ax, i))
+            entry = self._axes_draws.get(id(ax))
+            if entry is not None:
+                stats.update({key: entry[key] for key in ('wall_time', 'allocated', 'peak_allocated') if key in entry})
+            self.axes_stats.append(stats)
+
+    def to_dict(self):
+        return {'figure': self.name, 'phases': self.phases, 'artists': self.figure_stats, 'axes': self.axes_stats}
+
+
+class FigureProfiler:
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.records = []
+
+    # profile everything in the with block as the figure called name, the whole block is the 'figure' phase.
+    # If fig is given, its artists are counted at the end.
+    @contextmanager
+    def figure(self, name, fig=None):
+        started = self.trace_memory and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        record = FigureRecord(name)
+        self.records.append(record)
+        _active.append(record)
+        try:
+            with record.phase('figure'):
+                yield record
+        finally:
+            _active.pop()
+            if started:
+                tracemalloc.stop()
+        if fig is not None:
+            record.collect(fig)
+
+    def to_dicts(self):
+        return [record.to_dict() for record in self.records]
+
+    def to_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dicts(), f, indent=2)
+
+    def to_trace(self, path):
+        write_trace(self.to_dicts(), path)
+
+
+# write a list of record dicts as a Chrome trace. Each figure gets its own row (tid) starting at time zero, and each
+# phase is a complete ('X') event, so nested phases show up stacked like a flame graph.
+def write_trace(records, path):
+    events = []
+    for tid, record in enumerate(records):
+        for entry in record['phases']:
+            events.append({'name': entry['name'], 'cat': record['figure'], 'ph': 'X', 'pid': 1, 'tid': tid,
+                           'ts': entry['start'] * 1e6, 'dur': entry['wall_time'] * 1e6,
+                           'args': {k: entry[k] for k in ('allocated', 'peak_allocated') if k in entry}})
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': record['figure']}})
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+# the number of vertices an artist asks the renderer to draw
+def vertex_count(artist):
+    from matplotlib.collections import Collection
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+
+    if isinstance(artist, Line2D):
+        return len(artist.get_xydata())
+    if isinstance(artist, Collection):
+        path_vertices = sum(len(path.vertices) for path in artist.get_paths())
+        offsets = len(artist.get_offsets())
+        # a scatter is one marker path drawn at every offset
+        if offsets > 1 and len(artist.get_paths()) <= 1:
+            return offsets * path_vertices
+        return path_vertices
+    if isinstance(artist, Patch):
+        return len(artist.get_path().vertices)
+    return 0
+
+
+# artist counts by type and the total number of vertices, for artist and everything inside it
+def artist_stats(artist):
+    from matplotlib.image import AxesImage
+
+    counts = {}
+    vertices = 0
+    pixels = 0
+    stack = [artist]
+    while stack:
+        a = stack.pop()
+        kind = type(a).__name__
+        counts[kind] = counts.get(kind, 0) + 1
+        vertices += vertex_count(a)
+        if isinstance(a, AxesImage) and a.get_array() is not None:
+            pixels += a.get_array().size
+        stack.extend(a.get_children())
+    return {'artists': sum(counts.values()), 'vertices': vertices, 'image_pixels': pixels, 'by_type': counts}
@@ -0,0 +1,167 @@
+# QUICK PLOTTING ENTRY POINT
+
+# Each script imports matplotlib, pyplot, numpy, pandas, gridspec, animation and the inset_locator toolkit at the top,
+# whether or not the sections that follow use them, and coursera_week2.py calls mpl.get_backend(), which makes
+# matplotlib go looking for a GUI toolkit to use. For a short job that draws one chart and exits, that start-up is most
+# of the run time.
+
+# quickplot draws one chart from a data file to an image file. Nothing heavy is imported at the top of this file. The
+# backend is set to Agg through MPLBACKEND before matplotlib is imported, so no GUI toolkit is ever looked for, and the
+# figure is made with matplotlib.figure.Figure and the Agg canvas directly, so pyplot isn't imported at all. Each chart
+# only imports what it needs when it's asked for, pandas is never imported for the plain charts, and --timings reports
+# how long every import took.
+
+#   python quickplot.py hist data.npy out.png --bins 100
+#   python quickplot.py scatter data.csv out.svg --x height --y weight --timings
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+
+# how long each import took, in seconds, in the order they happened
+IMPORT_TIMES = {}
+
+
+def timed_import(name):
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMES[name] = time.perf_counter() - start
+    return module
+
+
+# a Figure with an Agg canvas, without going through pyplot
+def new_figure(figsize=None, dpi=100):
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    figure = timed_import('matplotlib.figure')
+    backend_agg = timed_import('matplotlib.backends.backend_agg')
+    fig = figure.Figure(figsize=figsize, dpi=dpi)
+    backend_agg.FigureCanvasAgg(fig)
+    return fig
+
+
+# the columns of a .npy, .npz or .csv file as a dict of name -> array, numeric csv files are read without pandas
+def load_columns(path):
+    np = timed_import('numpy')
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    if path.endswith('.npy'):
+        data = np.load(path, mmap_mode='r')
+        if data.ndim == 1:
+            return {'y': data}
+        return {'c{}'.format(i): data[:, i] for i in range(data.shape[1])}
+    with open(path) as f:
+        header = f.readline().strip().split(',')
+    data = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+    return {name.strip(): data[:, i] for i, name in enumerate(header)}
+
+
+def pick(columns, name, default_index=0):
+    if name is not None:
+        return columns[name]
+    return list(columns.values())[default_index]
+
+
+def draw_line(fig, columns, args):
+    ax = fig.add_subplot()
+    for name in args.columns or list(columns):
+        ax.plot(columns[name], label=name)
+    ax.legend()
+
+
+def draw_scatter(fig, columns, args):
+    fig.add_subplot().scatter(pick(columns, args.x, 0), pick(columns, args.y, 1), s=args.size)
+
+
+def draw_hist(fig, columns, args):
+    ax = fig.add_subplot()
+    for name in args.columns or list(columns)[:1]:
+        ax.hist(columns[name], bins=args.bins, alpha=0.7, label=name)
+
+
+def draw_bar(fig, columns, args):
+    np = timed_import('numpy')
+    bar_builder = timed_import('bar_builder')
+    names = args.columns or list(columns)
+    bar_builder.bar_chart(fig.add_subplot(), np.column_stack([columns[n] for n in names]), labels=names,
+                          stacked=args.stacked)
+
+
+def draw_box(fig, columns, args):
+    box_stats = timed_import('box_stats')
+    names = args.columns or list(columns)
+    box_stats.boxplot(fig.add_subplot(), [columns[n] for n in names], labels=names)
+
+
+def draw_hist2d(fig, columns, args):
+    ax = fig.add_subplot()
+    _, _, _, image = ax.hist2d(pick(columns, args.x, 0), pick(columns, args.y, 1), bins=args.bins)
+    fig.colorbar(image, ax=ax)
+
+
+def draw_kde(fig, columns, args):
+    fast_kde = timed_import('fast_kde')
+    ax = fig.add_subplot()
+    for name in args.columns or list(columns):
+        ax.plot(*fast_kde.binned_kde(columns[name]), label=name)
+    ax.legend()
+
+
+CHARTS = {
+    'line': draw_line,
+    'scatter': draw_scatter,
+    'hist': draw_hist,
+    'bar': draw_bar,
+    'box': draw_box,
+    'hist2d': draw_hist2d,
+    'kde': draw_kde,
+}
+
+
+def main(argv=None):
+    start = time.perf_counter()
+    parser = argparse.ArgumentParser(description='Draw one chart from a data file, with as little start-up as possible.')
+    parser.add_argument('chart', choices=sorted(CHARTS))
+    parser.add_argument('data', help='a .npy, .npz or .csv file')
+    parser.add_argument('out', help='output file, the format comes from the extension')
+    parser.add_argument('--columns', nargs='+', help='columns to plot, default depends on the chart')
+    parser.add_argument('--x')
+    parser.add_argument('--y')
+    parser.add_argument('--bins', type=int, default=10)
+    parser.add_argument('--size', type=float, default=None, help='marker size for scatter')
+    parser.add_argument('--stacked', action='store_true', help='stack the series of a bar chart')
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--timings', action='store_true', help='print import and phase timings as JSON to stderr')
+    args = parser.parse_args(argv)
+
+    timings = {}
+    t = time.perf_counter()
+    columns = load_columns(args.data)
+    timings['load'] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    fig = new_figure(dpi=args.dpi)
+    timings['figure'] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    CHARTS[args.chart](fig, columns, args)
+    timings['chart'] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    fig.savefig(args.out)
+    timings['save'] = time.perf_counter() - t
+    timings['total'] = time.perf_counter() - start
+
+    if args.timings:
+        json.dump({'imports': IMPORT_TIMES, 'phases': timings}, sys.stderr, indent=2)
+        sys.stderr.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
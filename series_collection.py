@@ -0,0 +1,156 @@
+# MANY SERIES AS ONE COLLECTION
+
+# coursera_week2.py plots three points with three plt.plot calls, plt.plot(1.5, 1.5, 'o'), plt.plot(2, 2, 'o') and
+# plt.plot(2.5, 2.5, 'o'), and ax.get_children() shows a Line2D for each of them. plt.plot(linear_data, '-o',
+# exponential_data, '-o') also makes one Line2D per series. Each Line2D is drawn on its own, with its own transform,
+# clipping and graphics context, so with thousands of series most of the drawing time goes on that and not on the lines.
+
+# plot_series takes all the series at once and draws their lines as a single LineCollection, and their markers as a
+# single PathCollection, with the color, width and style of every series in arrays. The series can be:
+
+#   a 2-D array, one series per column like plt.plot;
+#   a list of 1-D arrays of different lengths;
+#   a long-form DataFrame, with a column that says which series each row belongs to (group).
+
+# The legend still gets an entry per series, made from stand-in handles in the style of each one. fill_bands draws any
+# number of fill_between bands as a single PolyCollection.
+
+import numpy as np
+import matplotlib as mpl
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.lines import Line2D
+
+
+# the series as lists of x arrays, y arrays and labels
+def as_series(data, x=None, y=None, group=None, labels=None):
+    if group is not None:
+        # long form: one row per point, the rows of a series don't have to be next to each other
+        import pandas as pd
+        codes, names = pd.factorize(data[group], sort=True)
+        order = np.argsort(codes, kind='stable')
+        splits = np.flatnonzero(np.diff(codes[order])) + 1
+        ys = np.split(data[y].to_numpy(dtype=float)[order], splits)
+        xs = (np.split(data[x].to_numpy()[order], splits) if x is not None
+              else [np.arange(len(part), dtype=float) for part in ys])
+        return xs, ys, [str(name) for name in names] if labels is None else labels
+
+    if hasattr(data, 'columns'):
+        labels = [str(c) for c in data.columns] if labels is None else labels
+        x = data.index.to_numpy() if x is None else x
+        data = data.to_numpy(dtype=float)
+    if isinstance(data, np.ndarray) or (len(data) and np.ndim(data[0]) == 0):
+        values = np.asarray(data, dtype=float)
+        values = values[:, None] if values.ndim < 2 else values
+        ys = list(values.T)
+    else:
+        ys = [np.asarray(part, dtype=float).ravel() for part in data]
+
+    if x is None:
+        xs = [np.arange(len(part), dtype=float) for part in ys]
+    elif isinstance(x, (list, tuple)) and len(x) and np.ndim(x[0]) > 0:
+        xs = [np.asarray(part).ravel() for part in x]
+    else:
+        # one x for every series
+        xs = [np.asarray(x)] * len(ys)
+    if labels is None:
+        labels = ['Series {}'.format(j + 1) for j in range(len(ys))]
+    return xs, ys, labels
+
+
+# a per-series property: one value for all, or a list with one per series (repeated if it's too short)
+def per_series(value, n, default):
+    if value is None:
+        value = default
+    if isinstance(value, (str, tuple)) or np.ndim(value) == 0:
+        return [value] * n
+    return [value[j % len(value)] for j in range(n)]
+
+
+def cycle_colors(n):
+    cycle = mpl.rcParams['axes.prop_cycle'].by_key().get('color', ['C0'])
+    return [cycle[j % len(cycle)] for j in range(n)]
+
+
+# x values as floats for the collections, dates become matplotlib date numbers and get the date ticks of date_axis.py
+def as_float(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        from date_axis import to_plot_coords
+        return to_plot_coords(values), True
+    return values.astype(float), False
+
+
+# draw all the series on ax. linestyle='' (or 'none') leaves out the lines, marker=None leaves out the markers.
+# colors, linewidths, linestyles and markersizes can be one value or one per series.
+# Returns (lines, markers), either of which is None if it isn't drawn.
+def plot_series(ax, data, x=None, y=None, group=None, labels=None, colors=None, linewidths=None, linestyles='-',
+                marker=None, markersizes=None, alpha=None, legend=True, max_legend=20, **collection_kwds):
+    xs, ys, labels = as_series(data, x, y, group, labels)
+    n = len(ys)
+    colors = per_series(colors, n, None) if colors is not None else cycle_colors(n)
+    rgba = mpl.colors.to_rgba_array(colors, alpha)
+    linewidths = per_series(linewidths, n, mpl.rcParams['lines.linewidth'])
+    linestyles = per_series(linestyles, n, '-')
+    markersizes = per_series(markersizes, n, mpl.rcParams['lines.markersize'])
+
+    converted = [as_float(part) for part in xs]
+    dates = any(is_date for _, is_date in converted)
+    segments = [np.column_stack([xf, yv]) for (xf, _), yv in zip(converted, ys)]
+
+    lines = None
+    drawn = [j for j in range(n) if linestyles[j] not in ('', 'none', 'None', ' ')]
+    if drawn:
+        lines = LineCollection([segments[j] for j in drawn], colors=rgba[drawn],
+                               linewidths=[linewidths[j] for j in drawn], linestyles=[linestyles[j] for j in drawn],
+                               **collection_kwds)
+        ax.add_collection(lines, autolim=False)
+
+    markers = None
+    if marker is not None:
+        # every point of a series gets the series' color and size, all in one PathCollection
+        lengths = [len(segment) for segment in segments]
+        points = np.concatenate(segments) if segments else np.empty((0, 2))
+        markers = ax.scatter(points[:, 0], points[:, 1], marker=marker, c=np.repeat(rgba, lengths, axis=0),
+                             s=np.repeat(np.square(markersizes), lengths), zorder=2.1)
+
+    finite = np.concatenate(segments) if segments else np.empty((0, 2))
+    finite = finite[np.isfinite(finite).all(axis=1)]
+    if len(finite):
+        ax.update_datalim(finite)
+    if dates:
+        from date_axis import date_axis
+        date_axis(ax)
+    ax.autoscale_view()
+
+    if legend and labels:
+        handles = [Line2D([], [], color=rgba[j], linewidth=linewidths[j],
+                          linestyle=linestyles[j] if j in drawn else 'none', marker=marker,
+                          markersize=markersizes[j], label=labels[j]) for j in range(min(n, max_legend))]
+        ax.legend(handles=handles)
+    return lines, markers
+
+
+# fill_between for any number of bands as one PolyCollection.
+# x is shared, lower and upper are 1-D for one band or 2-D with one band per column.
+def fill_bands(ax, x, lower, upper, colors=None, alpha=None, **collection_kwds):
+    x, dates = as_float(x)
+    lower = np.asarray(lower, dtype=float)
+    upper = np.asarray(upper, dtype=float)
+    lower = lower[:, None] if lower.ndim == 1 else lower
+    upper = upper[:, None] if upper.ndim == 1 else upper
+    lower, upper = np.broadcast_arrays(lower, upper)
+    n = lower.shape[1]
+    colors = per_series(colors, n, None) if colors is not None else cycle_colors(n)
+    # each band goes along the lower edge and back along the upper one
+    xx = np.concatenate([x, x[::-1]])
+    polygons = [np.column_stack([xx, np.concatenate([lower[:, j], upper[::-1, j]])]) for j in range(n)]
+    bands = PolyCollection(polygons, facecolors=mpl.colors.to_rgba_array(colors, alpha), edgecolors='none',
+                           **collection_kwds)
+    ax.add_collection(bands, autolim=False)
+    points = np.concatenate(polygons)
+    ax.update_datalim(points[np.isfinite(points).all(axis=1)])
+    if dates:
+        from date_axis import date_axis
+        date_axis(ax)
+    ax.autoscale_view()
+    return bands
@@ -0,0 +1,112 @@
+# SMALL MULTIPLES
+
+# coursera_week3.py makes a 3x3 grid with plt.subplots(3, 3, sharex=True, sharey=True), turns on every tick label of
+# every axes and forces a full canvas.draw(). The axes share their limits, but at draw time each one still asks the
+# locator where its ticks go, formats its own labels and lays out its own text. In a 20x20 grid that's 400 times the
+# same work, and it ends up costing more than the data.
+
+# SmallMultiples works the ticks out once for each shared axis, with the locator and formatter of the first panel, and
+# then gives every panel a FixedLocator and FixedFormatter with the result. Only the outer panels show tick labels
+# unless inner_labels is set. When the limits change the ticks are worked out again, once.
+
+# hist draws a histogram in every panel from a single binning pass: all the samples are binned against one set of edges
+# together, and each panel gets its counts as a single StepPatch instead of one Rectangle per bin.
+
+# render_tiled draws each panel as its own small figure in a process pool and pastes the pictures together into one
+# image, for grids so big that even drawing them in one process is too slow.
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.ticker import FixedFormatter, FixedLocator
+
+from array_helpers import bin_index
+
+
+class SmallMultiples:
+
+    def __init__(self, fig, nrows, ncols, sharex=True, sharey=True, inner_labels=False, **subplots_kwargs):
+        self.fig = fig
+        self.axes = fig.subplots(nrows, ncols, sharex=sharex, sharey=sharey, squeeze=False, **subplots_kwargs)
+        self.sharex = sharex
+        self.sharey = sharey
+        if inner_labels:
+            for ax in self.axes.flat:
+                ax.tick_params(labelbottom=True, labelleft=True)
+        self._cids = []
+        first = self.axes[0, 0]
+        if sharex is True:
+            self._cids.append(first.callbacks.connect('xlim_changed', lambda ax: self.freeze_ticks('x')))
+        if sharey is True:
+            self._cids.append(first.callbacks.connect('ylim_changed', lambda ax: self.freeze_ticks('y')))
+
+    # work out the ticks and labels of a shared axis once, and fix them on every panel
+    def freeze_ticks(self, which='both'):
+        for name, shared in (('x', self.sharex), ('y', self.sharey)):
+            if shared is not True or which not in (name, 'both'):
+                continue
+            axis = getattr(self.axes[0, 0], name + 'axis')
+            lo, hi = sorted(axis.get_view_interval())
+            # ask the panel's own (automatic) locator and formatter, even if fixed ones were put in its place before
+            locator, formatter = getattr(self, '_' + name + '_ticker', (None, None))
+            if locator is None:
+                locator, formatter = axis.get_major_locator(), axis.get_major_formatter()
+                setattr(self, '_' + name + '_ticker', (locator, formatter))
+            locs = [loc for loc in locator.tick_values(lo, hi) if lo <= loc <= hi]
+            labels = formatter.format_ticks(locs)
+            for ax in self.axes.flat:
+                panel_axis = getattr(ax, name + 'axis')
+                panel_axis.set_major_locator(FixedLocator(locs))
+                panel_axis.set_major_formatter(FixedFormatter(labels))
+
+    # a histogram in every panel, samples[i] goes in panel i (row by row). All the samples share the same edges, like
+    # the axes share x, and are binned together in one bincount.
+    def hist(self, samples, bins=100, range=None, **stairs_kwargs):
+        samples = [np.asarray(sample, dtype=float).ravel() for sample in samples]
+        if range is None:
+            range = (min(s.min() for s in samples if len(s)), max(s.max() for s in samples if len(s)))
+        edges = np.linspace(range[0], range[1], bins + 1)
+        counts = batched_histogram(samples, edges)
+        patches = [ax.stairs(c, edges, fill=True, **stairs_kwargs) for ax, c in zip(self.axes.flat, counts)]
+        self.freeze_ticks()
+        return counts, edges, patches
+
+
+# the histograms of several samples against the same edges, as one (len(samples), bins) array
+def batched_histogram(samples, edges):
+    nbins = len(edges) - 1
+    lengths = [len(s) for s in samples]
+    values = np.concatenate(samples) if samples else np.empty(0)
+    panel = np.repeat(np.arange(len(samples)), lengths)
+    index = bin_index(values, edges)
+    inside = (index >= 0) & (index < nbins)
+    flat = np.bincount(panel[inside] * nbins + index[inside], minlength=len(samples) * nbins)
+    return flat.reshape(len(samples), nbins)
+
+
+def render_tile(draw_panel, i, size, dpi, xlim, ylim):
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=size, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    draw_panel(ax, i)
+    if xlim is not None:
+        ax.set_xlim(xlim)
+    if ylim is not None:
+        ax.set_ylim(ylim)
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+
+# draw nrows * ncols panels with draw_panel(ax, i) in a process pool and return the whole grid as one RGBA image.
+# draw_panel has to be a module level function so it can be sent to the workers, and xlim/ylim are shared by all the
+# panels (they can't find out each other's limits). Save the result with plt.imsave, or show it with imshow.
+def render_tiled(draw_panel, nrows, ncols, tile_size=(2, 2), dpi=100, xlim=None, ylim=None, workers=None):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_tile, draw_panel, i, tile_size, dpi, xlim, ylim) for i in range(nrows * ncols)]
+        tiles = [future.result() for future in futures]
+    rows = [np.concatenate(tiles[r * ncols:(r + 1) * ncols], axis=1) for r in range(nrows)]
+    return np.concatenate(rows, axis=0)
@@ -0,0 +1,80 @@
+# STREAMING HISTOGRAM ANIMATION
+
+# The animation example in coursera_week3.py clears the axes with cla() on every tick and calls hist() again on the
+# whole slice x[:curr]. That means every frame re-bins every sample seen so far and tears down and rebuilds every bar,
+# the axis, the labels and the annotation.
+
+# Because the bin edges never change between frames, we don't have to do any of that. We can keep a running array of
+# counts, add only the samples that arrived since the last frame, and then change the height of the Rectangle patches
+# we already have. With blitting turned on, FuncAnimation only redraws the bars and the 'n = ...' annotation on top of
+# a cached background, so the title, labels and ticks are rendered once.
+
+import numpy as np
+import matplotlib.animation as animation
+
+
+class StreamingHistogram:
+
+    # ax is the axes to draw into, bins is the fixed array of bin edges (like np.arange(-4, 4, 0.5)).
+    # ylim and label_xy are used to fix the y axis and place the 'n = ...' annotation, since with fixed bins we don't
+    # want the histogram to autoscale between frames.
+    def __init__(self, ax, bins, ylim=None, label_xy=None):
+        self.ax = ax
+        self.edges = np.asarray(bins, dtype=float)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.n = 0
+
+        # draw the empty bars once, these are the Rectangle patches we will update in place
+        _, _, self.patches = ax.hist(np.empty(0), bins=self.edges)
+        ax.set_xlim(self.edges[0], self.edges[-1])
+        if ylim is not None:
+            ax.set_ylim(*ylim)
+        if label_xy is None:
+            x0, x1 = ax.get_xlim()
+            y0, y1 = ax.get_ylim()
+            label_xy = [x1 - 0.125 * (x1 - x0), y1 - 0.1 * (y1 - y0)]
+        self.annotation = ax.annotate('n = 0', label_xy)
+
+        # animated artists are left out of the normal draw, and redrawn by the blitting code instead
+        for patch in self.patches:
+            patch.set_animated(True)
+        self.annotation.set_animated(True)
+
+    # the artists that change between frames, this is what FuncAnimation needs back when blit=True
+    def artists(self):
+        return list(self.patches) + [self.annotation]
+
+    # add a chunk of new samples to the counts and update the bars
+    def add(self, samples):
+        samples = np.asarray(samples, dtype=float).ravel()
+        if samples.size:
+            # same binning as np.histogram: half open bins, except the last one which includes the right edge
+            idx = np.searchsorted(self.edges, samples, side='right') - 1
+            idx[samples == self.edges[-1]] = len(self.counts) - 1
+            inside = (idx >= 0) & (idx < len(self.counts))
+            self.counts += np.bincount(idx[inside], minlength=len(self.counts))
+            self.n += samples.size
+
+        for patch, height in zip(self.patches, self.counts):
+            patch.set_height(height)
+        self.annotation.set_text('n = {}'.format(self.n))
+        return self.artists()
+
+    # forget every sample, used when the animation starts (or restarts)
+    def reset(self):
+        self.counts[:] = 0
+        self.n = 0
+        return self.add(np.empty(0))
+
+    # build a FuncAnimation that streams data into the histogram, step samples per frame.
+    # The frames run out at the end of the data, so there's no need to call a.event_source.stop() ourselves.
+    def animate(self, fig, data, step=1, interval=100, blit=True):
+        data = np.asarray(data)
+        ends = list(range(step, len(data), step)) + [len(data)]
+        starts = [0] + ends[:-1]
+
+        def update(frame):
+            return self.add(data[starts[frame]:ends[frame]])
+
+        return animation.FuncAnimation(fig, update, frames=len(ends), init_func=self.reset,
+                                       interval=interval, blit=blit, repeat=False)